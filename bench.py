@@ -0,0 +1,211 @@
+# Frame-time benchmarks: drives the real fruit.Game and menu pages under SDL's dummy
+# video driver with scripted scenarios, reports update/draw/present percentiles and
+# allocation pressure, and compares against a saved JSON baseline.
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import argparse, gc, json, platform, random, subprocess, sys, tempfile, time, tracemalloc
+
+import pygame
+import fruit
+from leaderboard import Leaderboard
+from sim import STEP, WIN_W, WIN_H, BONUS_DURATION
+
+perf = time.perf_counter
+
+# ---------- Scenarios ----------
+# a scenario is set up once, then frame(i) runs one frame and returns (update, draw, present) seconds
+class GameScenario:
+    def __init__(self, diff, engine="sprites", stress=0, bonus=False, blasts=0, dirty=False, scale=1.0, smooth=True):
+        self.diff=diff; self.engine=engine; self.stress=stress
+        self.bonus=bonus; self.blasts=blasts; self.dirty=dirty; self.scale=scale; self.smooth=smooth
+    def setup(self):
+        fruit.view.set_scale(self.scale); fruit.view.smooth = self.smooth
+        self.seed = 1; self.rng = random.Random(1); self.game = None
+        self.game = self.new_game()
+        self.renderer = fruit.DirtyRenderer() if self.dirty else None
+    def new_game(self):
+        self.seed += 1
+        if self.game: self.game.recycle()
+        return fruit.Game("bench", self.diff, self.engine, self.stress, seed=self.seed)
+    def move(self, i):
+        # sweep left, pause, sweep right, pause
+        return (-1, 0, 1, 0)[(i//45) % 4]
+    def frame(self, i):
+        t0 = perf()
+        game = self.game
+        if game.game_over: game = self.game = self.new_game()
+        if self.bonus: game.sim.bonus = True; game.sim.bonus_timer = BONUS_DURATION
+        if self.blasts and i % 30 == 0:
+            for _ in range(self.blasts): game.explode((self.rng.randint(80, WIN_W-80), self.rng.randint(80, WIN_H-80)))
+        for c in fruit.clouds: c.update(STEP, game.cloud_wind)
+        game.update(STEP, self.move(i))
+        t1 = perf()
+        if self.renderer: rects = self.renderer.draw(game, fruit.view.canvas)
+        else: game.draw(fruit.view.canvas)
+        t2 = perf()
+        fruit.view.present()
+        if self.renderer: self.renderer.flip(rects)
+        else: pygame.display.flip()
+        return t1-t0, t2-t1, perf()-t2
+
+class MenuScenario:
+    def __init__(self, page):
+        self.page = page
+    def setup(self):
+        fruit.view.set_scale(1.0)
+        self.start = fruit.StartPage(); self.start.nickname = "bench"
+    def frame(self, i):
+        # the mouse walks across the buttons so hover states keep changing
+        mouse = (100 + (i*7) % 620, 150 + (i*3) % 600)
+        t0 = perf()
+        if self.page == "start": self.start.tick(STEP)
+        t1 = perf()
+        canvas = fruit.view.canvas
+        if self.page == "start": self.start.draw(canvas, mouse)
+        elif self.page == "instructions": fruit.draw_instructions(canvas, mouse)
+        else: fruit.draw_highscores(canvas, mouse)
+        t2 = perf()
+        pygame.display.flip()
+        return t1-t0, t2-t1, perf()-t2
+
+SCENARIOS = {
+    "easy":              lambda: GameScenario("Easy"),
+    "medium":            lambda: GameScenario("Medium"),
+    "hard":              lambda: GameScenario("Hard"),
+    "medium-dirty":      lambda: GameScenario("Medium", dirty=True),
+    "medium-0.5x":       lambda: GameScenario("Medium", scale=0.5),
+    "medium-1.5x":       lambda: GameScenario("Medium", scale=1.5),
+    "medium-0.5x-fast":  lambda: GameScenario("Medium", scale=0.5, smooth=False),
+    "bonus":             lambda: GameScenario("Hard", bonus=True),
+    "explosions":        lambda: GameScenario("Medium", blasts=8),
+    "entities-3000":     lambda: GameScenario("Easy", engine="numpy", stress=3000),
+    "menu-start":        lambda: MenuScenario("start"),
+    "menu-instructions": lambda: MenuScenario("instructions"),
+    "menu-highscores":   lambda: MenuScenario("highscores"),
+}
+PHASES = ("update", "draw", "present", "frame")
+
+# ---------- Measurement ----------
+def percentiles(samples):
+    s = sorted(samples); n = len(s)
+    pick = lambda q: s[min(n-1, int(q*n))] * 1000.0
+    return {"p50":pick(0.50), "p95":pick(0.95), "p99":pick(0.99), "mean":sum(s)/n*1000.0}
+
+def run_scenario(scenario, frames, warmup=60, alloc_frames=200):
+    scenario.setup()
+    for i in range(warmup): scenario.frame(i)
+    times = {p:[] for p in PHASES}
+    gc0 = gc.get_stats()[0]["collections"]; blocks0 = sys.getallocatedblocks(); sprites0 = fruit.pool_totals()[1]
+    for i in range(warmup, warmup+frames):
+        u, d, p = scenario.frame(i)
+        times["update"].append(u); times["draw"].append(d); times["present"].append(p); times["frame"].append(u+d+p)
+    gc_runs = gc.get_stats()[0]["collections"] - gc0
+    net_blocks = (sys.getallocatedblocks() - blocks0) / frames
+    sprite_allocs = fruit.pool_totals()[1] - sprites0
+    # separate traced pass: tracemalloc slows frames down, so it never overlaps the timing pass
+    tracemalloc.start(); peaks = []
+    base = warmup + frames
+    for i in range(base, base+alloc_frames):
+        tracemalloc.reset_peak(); cur = tracemalloc.get_traced_memory()[0]
+        scenario.frame(i)
+        peaks.append(tracemalloc.get_traced_memory()[1] - cur)
+    tracemalloc.stop()
+    result = {p:percentiles(times[p]) for p in PHASES}
+    result["alloc_kb_per_frame"] = sum(peaks) / len(peaks) / 1024.0
+    result["net_blocks_per_frame"] = net_blocks
+    result["gc_gen0_per_1k_frames"] = gc_runs * 1000.0 / frames
+    result["sprite_allocs_per_1k_frames"] = sprite_allocs * 1000.0 / frames
+    return result
+
+def run(names, frames, startup_runs=0):
+    # highscores written by games that end during a run go to a throwaway file
+    fruit.leaderboard = Leaderboard(os.path.join(tempfile.mkdtemp(prefix="bb-bench-"), "highscores.json"))
+    results = {}
+    for name in names:
+        results[name] = run_scenario(SCENARIOS[name](), frames)
+        r = results[name]
+        print(f"{name:<18} " + "  ".join(f"{p} {r[p]['p50']:6.3f}/{r[p]['p95']:6.3f}/{r[p]['p99']:6.3f}" for p in PHASES[:3])
+              + f"  alloc {r['alloc_kb_per_frame']:6.1f}KB")
+    startup = run_startup(startup_runs) if startup_runs else None
+    return {"startup":startup, "meta":{"python":platform.python_version(), "pygame":pygame.version.ver, "platform":platform.platform(),
+                    "video_driver":os.environ.get("SDL_VIDEODRIVER"), "frames":frames, "when":time.strftime("%Y-%m-%d %H:%M")},
+            "scenarios":results}
+
+# ---------- Startup ----------
+# time-to-first-frame of the start page in a fresh interpreter: import, display and fonts,
+# sound warm-up kicked off as main() does, then one drawn and flipped menu frame
+STARTUP_CHILD = """
+import time; t0 = time.perf_counter()
+import pygame, fruit
+fruit.sounds.warm()
+fruit.StartPage().draw(fruit.view.canvas, (0, 0)); pygame.display.flip()
+print(f"{(time.perf_counter()-t0)*1000:.3f}")
+"""
+
+def run_startup(runs):
+    # the first run starts from an empty sound cache (cold), the rest reuse it (warm)
+    env = dict(os.environ, BB_CACHE_DIR=tempfile.mkdtemp(prefix="bb-bench-cache-"))
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc, inproc = [], []
+    for _ in range(runs):
+        t = perf()
+        out = subprocess.run([sys.executable, "-c", STARTUP_CHILD], cwd=here, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        proc.append(perf() - t); inproc.append(float(out.split()[-1]) / 1000.0)
+    result = {"cold_ms": proc[0]*1000.0, "cold_first_frame_ms": inproc[0]*1000.0}
+    if runs > 1:
+        result["warm"] = percentiles(proc[1:]); result["warm_first_frame"] = percentiles(inproc[1:])
+    print(f"{'startup':<18} cold {result['cold_ms']:7.1f}ms (first frame {result['cold_first_frame_ms']:6.1f}ms in-process)"
+          + (f"  warm p50 {result['warm']['p50']:7.1f}ms (first frame {result['warm_first_frame']['p50']:6.1f}ms)" if runs > 1 else ""))
+    return result
+
+# ---------- Baselines ----------
+def compare(base, cur, threshold, floor_ms=0.05):
+    # a regression is p50 or p95 slower than baseline by more than threshold (and floor_ms absolute)
+    regressions = []
+    for name, r in cur["scenarios"].items():
+        b = base["scenarios"].get(name)
+        if not b: continue
+        for phase in PHASES:
+            for q in ("p50", "p95"):
+                old, new = b[phase][q], r[phase][q]
+                if new > old*(1+threshold) and new - old > floor_ms:
+                    regressions.append((name, phase, q, old, new))
+    bs, cs = base.get("startup"), cur.get("startup")
+    if bs and cs and "warm" in bs and "warm" in cs:
+        old, new = bs["warm"]["p50"], cs["warm"]["p50"]
+        if new > old*(1+threshold) and new - old > 5.0:
+            regressions.append(("startup", "warm", "p50", old, new))
+    for name, phase, q, old, new in regressions:
+        print(f"REGRESSION {name} {phase} {q}: {old:.3f}ms -> {new:.3f}ms (+{(new/old-1)*100 if old else float('inf'):.0f}%)")
+    if not regressions: print(f"no regressions beyond {threshold*100:.0f}%")
+    return regressions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Bomb & Berry frame-time benchmarks (SDL dummy driver)")
+    ap.add_argument("--frames", type=int, default=600, help="timed frames per scenario")
+    ap.add_argument("--only", help="comma-separated scenario names (default: all)")
+    ap.add_argument("--save", metavar="JSON", help="write results as a baseline file")
+    ap.add_argument("--compare", metavar="JSON", help="baseline to compare against")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown before flagging (0.15 = 15%%)")
+    ap.add_argument("--startup-runs", type=int, default=5, metavar="N",
+                    help="fresh-process time-to-first-frame runs (first is a cold sound cache; 0 skips)")
+    ap.add_argument("--list", action="store_true", help="list scenarios and exit")
+    args = ap.parse_args(argv)
+    if args.list:
+        print("\n".join(SCENARIOS)); return 0
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown: ap.error("unknown scenario(s): " + ", ".join(unknown))
+    print("times in ms as p50/p95/p99")
+    cur = run(names, args.frames, args.startup_runs)
+    if args.save:
+        with open(args.save, "w") as f: json.dump(cur, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f: base = json.load(f)
+        return 1 if compare(base, cur, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
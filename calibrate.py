@@ -0,0 +1,171 @@
+# Difficulty calibration: thousands of headless autoplay games per setting, spread over a
+# process pool (each worker steps a chunk of games at once with env.BatchEnv), reporting
+# score, survival-time and bomb-hit distributions for each difficulty x policy, optionally
+# over a grid of overridden table values.
+import argparse, itertools, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from env import BatchEnv, OBS_DROPS
+from sim import WIN_W, WIN_H, STEP, DIFFICULTY, RAMP_SCORE, PLAYER_W, PLAYER_H, BOMB_SIZE
+
+FIELDS = ("interval", "fruit", "bomb", "lives")     # DIFFICULTY tuple order; "ramp" is separate
+PLAYER_TOP = WIN_H - 40 - PLAYER_H
+
+# ---------- Policies ----------
+# scripted catchers over BatchEnv observations; all games in a chunk decide at once
+class Policy:
+    DEFAULTS = {"reaction": 0.1, "noise": 0.0, "deadzone": 8.0, "lookahead": 160.0, "margin": 12.0}
+    def __init__(self, spec):
+        # "name" or "name:key=val,key=val", e.g. "dodge:reaction=0.2,noise=0.05"
+        self.spec = spec
+        name, _, opts = spec.partition(":")
+        if name not in ("idle", "random", "chase", "dodge"): raise ValueError(f"unknown policy {name!r}")
+        self.name = name; self.opts = dict(self.DEFAULTS)
+        for kv in filter(None, opts.split(",")):
+            k, _, v = kv.partition("=")
+            if k not in self.opts: raise ValueError(f"unknown policy option {k!r}")
+            self.opts[k] = float(v)
+        self.prev = None
+    def act(self, obs, rng):
+        n = len(obs); o = self.opts
+        if self.name == "idle": move = np.zeros(n, np.int32)
+        elif self.name == "random":
+            move = rng.integers(-1, 2, n).astype(np.int32)
+            if self.prev is not None: move = np.where(rng.random(n) < 0.9, self.prev, move)
+        else:
+            d = obs[:, 4:].reshape(n, OBS_DROPS, 4)
+            dx = d[:,:,0] * WIN_W; y = d[:,:,1] * WIN_H; bomb = d[:,:,2] > 0; present = d[:,:,3] > 0
+            # drops come lowest first: chase the lowest fruit
+            fruit = present & ~bomb
+            first = np.argmax(fruit, axis=1); tx = dx[np.arange(n), first]
+            move = np.where(fruit.any(axis=1) & (np.abs(tx) > o["deadzone"]), np.sign(tx), 0).astype(np.int32)
+            if self.name == "dodge":
+                reach = (PLAYER_W + BOMB_SIZE)/2 + o["margin"]
+                threat = present & bomb & (y > PLAYER_TOP - o["lookahead"]) & (np.abs(dx) < reach)
+                near = np.argmax(threat, axis=1); bx = dx[np.arange(n), near]
+                # step away from the closest low bomb; away from the wall when it's dead centre
+                away = np.where(bx > 0, -1, 1)
+                away = np.where(bx == 0, np.where(obs[:,0] < 0.5, 1, -1), away)
+                move = np.where(threat.any(axis=1), away, move).astype(np.int32)
+        if o["noise"]:
+            flip = rng.random(n) < o["noise"]
+            move = np.where(flip, rng.integers(-1, 2, n), move).astype(np.int32)
+        self.prev = move
+        return move
+
+# ---------- Workers ----------
+def run_chunk(task):
+    # plays n games of one setting to the end (or max_time); returns per-game arrays
+    label, params, ramp, spec, n, seed, max_time = task
+    env = BatchEnv(n, params=params, ramp=ramp, seed=seed, autoreset=False)
+    policy = Policy(spec); rng = np.random.default_rng(seed + 1)
+    every = max(1, round(policy.opts["reaction"] / STEP))
+    obs = env.observe(); move = np.zeros(n, np.int32)
+    first_hit = np.full(n, np.nan); steps = 0
+    for i in range(int(max_time / STEP)):
+        if i % every == 0: move = policy.act(obs, rng)
+        lives = env.lives.copy()
+        obs, _, _ = env.step(move); steps += 1
+        hit = (env.lives < lives) & np.isnan(first_hit)
+        first_hit[hit] = env.time[hit]
+        if env.done.all(): break
+    return {"label": label, "policy": spec, "score": env.score.copy(), "time": env.time.copy(),
+            "hits": env.start_lives - env.lives, "first_hit": first_hit, "ended": env.done.copy(),
+            "steps": steps * n}
+
+# ---------- Settings ----------
+def settings(diffs, grid, ramps):
+    # (label, table tuple, ramp) for every difficulty x grid point
+    keys = list(grid); out = []
+    for diff in diffs:
+        for combo in itertools.product(*(grid[k] for k in keys)):
+            table = list(DIFFICULTY[diff]); over = dict(zip(keys, combo))
+            for k, v in over.items(): table[FIELDS.index(k)] = v
+            for ramp in ramps:
+                label = " ".join([diff] + [f"{k}={v:g}" for k, v in over.items()] + ([f"ramp={ramp:g}"] if len(ramps) > 1 else []))
+                out.append((label, tuple(table), ramp))
+    return out
+
+def parse_grid(items):
+    grid, ramps = {}, [RAMP_SCORE]
+    for item in items:
+        k, _, vals = item.partition("=")
+        values = [float(v) for v in vals.split(",") if v]
+        if k == "ramp": ramps = values
+        elif k in FIELDS: grid[k] = [int(v) for v in values] if k == "lives" else values
+        else: raise ValueError(f"unknown grid field {k!r} (use {', '.join(FIELDS)}, ramp)")
+    return grid, ramps
+
+# ---------- Report ----------
+def pct(a, qs=(10, 50, 90)):
+    a = a[~np.isnan(a)]
+    return [float(np.percentile(a, q)) if len(a) else float("nan") for q in qs]
+
+def summarize(parts):
+    score = np.concatenate([p["score"] for p in parts]).astype(float)
+    t = np.concatenate([p["time"] for p in parts]); hits = np.concatenate([p["hits"] for p in parts])
+    first = np.concatenate([p["first_hit"] for p in parts]); ended = np.concatenate([p["ended"] for p in parts])
+    counts, edges = np.histogram(score, bins=20)
+    return {"games": len(score), "score_mean": float(score.mean()), "score_p10_50_90": pct(score),
+            "survival_p10_50_90": pct(t), "first_hit_p10_50_90": pct(first),
+            "hits_per_min": float(hits.sum() / max(t.sum(), 1e-9) * 60.0),
+            "capped": float((~ended).mean()),
+            "score_hist": {"counts": counts.tolist(), "edges": edges.tolist()}}
+
+def print_report(rows):
+    print(f"{'setting':<34} {'policy':<22} {'games':>6} {'score p10/p50/p90':>20} {'mean':>7} "
+          f"{'survival s p10/p50/p90':>24} {'1st hit s':>9} {'hits/min':>8} {'capped':>7}")
+    for (label, policy), r in rows.items():
+        s = r["score_p10_50_90"]; t = r["survival_p10_50_90"]
+        print(f"{label:<34} {policy:<22} {r['games']:>6} {s[0]:>6.0f}/{s[1]:>6.0f}/{s[2]:>6.0f} {r['score_mean']:>7.1f} "
+              f"{t[0]:>7.1f}/{t[1]:>7.1f}/{t[2]:>7.1f} {r['first_hit_p10_50_90'][1]:>9.1f} {r['hits_per_min']:>8.2f} "
+              f"{r['capped']*100:>6.1f}%")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="calibrate the DIFFICULTY table with autoplay bots")
+    ap.add_argument("--diffs", default=",".join(DIFFICULTY), help="difficulties to start from")
+    ap.add_argument("--policies", nargs="+", default=["chase", "dodge"], metavar="POLICY",
+                    help="idle, random, chase, dodge; options as name:reaction=0.2,noise=0.05,deadzone=8,lookahead=160,margin=12")
+    ap.add_argument("--grid", nargs="*", default=[], metavar="FIELD=V1,V2",
+                    help="override table fields (interval, fruit, bomb, lives) or the score ramp (ramp) per run")
+    ap.add_argument("--games", type=int, default=1000, help="games per setting x policy")
+    ap.add_argument("--max-time", type=float, default=300.0, help="stop a game after this many seconds")
+    ap.add_argument("--chunk", type=int, default=250, help="games per worker task")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", metavar="FILE", help="also write the report with score histograms")
+    args = ap.parse_args(argv)
+    try:
+        grid, ramps = parse_grid(args.grid)
+        policies = [Policy(s) for s in args.policies]
+        diffs = args.diffs.split(",")
+        unknown = [d for d in diffs if d not in DIFFICULTY]
+        if unknown: raise ValueError("unknown difficulty " + ", ".join(unknown))
+    except ValueError as e:
+        ap.error(str(e))
+    tasks = []; seed = args.seed
+    for label, table, ramp in settings(diffs, grid, ramps):
+        for p in policies:
+            for start in range(0, args.games, args.chunk):
+                seed += 1
+                tasks.append((label, table, ramp, p.spec, min(args.chunk, args.games - start), seed, args.max_time))
+    t = time.perf_counter(); parts = {}; steps = 0
+    with ProcessPoolExecutor(args.workers) as pool:
+        for r in pool.map(run_chunk, tasks):
+            parts.setdefault((r["label"], r["policy"]), []).append(r); steps += r["steps"]
+    wall = time.perf_counter() - t
+    tables = {label: (table, ramp) for label, table, ramp in settings(diffs, grid, ramps)}
+    rows = {k: summarize(v) for k, v in parts.items()}
+    print_report(rows)
+    print(f"{sum(r['games'] for r in rows.values())} games, {steps:,} game steps in {wall:.1f}s on {args.workers} workers "
+          f"({steps/wall:,.0f} steps/s)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"max_time": args.max_time, "rows": [dict(setting=k[0], policy=k[1], table=tables[k[0]][0],
+                       ramp=tables[k[0]][1], **v) for k, v in rows.items()]}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# NumPy struct-of-arrays entity engine for falling objects.
+# ArrayGame keeps sim.SimGame's rules but stores drops as parallel arrays, so movement,
+# off-screen culling and player overlap are a handful of vectorized ops per frame.
+import argparse, time
+import numpy as np
+
+from sim import WIN_W, WIN_H, FPS, FRUIT_SPEED_BASE, FRUIT_NAMES, FRUIT_SIZE, KINDS, BOMB_KIND, SimGame
+
+# ---------- Storage ----------
+class DropArrays:
+    # live drops are kept packed in [0, n); capacity doubles when full
+    def __init__(self, capacity=64):
+        self.n = 0
+        self.x = np.zeros(capacity, np.int32); self.y = np.zeros(capacity); self.prev_y = np.zeros(capacity)
+        self.speed = np.zeros(capacity, np.int32); self.size = np.zeros(capacity, np.int32)
+        self.kind = np.zeros(capacity, np.int8); self.alive = np.zeros(capacity, bool)
+    def fields(self):
+        return ("x", "y", "prev_y", "speed", "size", "kind", "alive")
+    def grow(self, need):
+        cap = len(self.x)
+        if need <= cap: return
+        while cap < need: cap *= 2
+        for f in self.fields():
+            a = getattr(self, f); b = np.zeros(cap, a.dtype); b[:self.n] = a[:self.n]
+            setattr(self, f, b)
+    def add(self, x, y, speed, size, kind):
+        k = np.size(x); self.grow(self.n + k); s = slice(self.n, self.n + k)
+        self.x[s] = x; self.y[s] = y; self.prev_y[s] = y; self.speed[s] = speed
+        self.size[s] = size; self.kind[s] = kind; self.alive[s] = True
+        self.n += k
+    def view(self, f):
+        return getattr(self, f)[:self.n]
+    def compact(self):
+        keep = np.flatnonzero(self.alive[:self.n])
+        if len(keep) == self.n: return
+        for f in self.fields():
+            a = getattr(self, f); a[:len(keep)] = a[keep]
+        self.n = len(keep)
+
+# ---------- Game ----------
+class ArrayGame(SimGame):
+    def __init__(self, diff="Medium", seed=None, stress=0):
+        super().__init__(diff, seed, stress)
+        # bulk stress rain comes from a numpy generator seeded off the game rng
+        self.np_rng = np.random.default_rng(self.rng.getrandbits(64)) if stress else None
+    def init_drops(self):
+        self.drops = DropArrays(max(64, self.stress*2))
+    def _store(self, d, kind):
+        self.drops.add(d.x, d.y, d.speed, d.w, kind)
+        return d
+    def spawn_fruit(self):
+        d = self.roll_fruit()
+        return self._store(d, FRUIT_NAMES.index(d.name))
+    def spawn_bomb(self):
+        return self._store(self.roll_bomb(), BOMB_KIND)
+    def top_up(self):
+        k = self.stress - self.drops.n
+        if k <= 0: return
+        r = self.np_rng
+        cx = r.integers(28, WIN_W-28, k, endpoint=True)
+        speed = (FRUIT_SPEED_BASE*self.fruit_mult + r.integers(-30, 30, k, endpoint=True)).astype(np.int32)
+        self.drops.add(cx - FRUIT_SIZE//2, r.integers(-WIN_H, -40, k, endpoint=True), speed,
+                       FRUIT_SIZE, r.integers(0, BOMB_KIND, k))
+    def drop_count(self):
+        return self.drops.n
+    def move_drops(self, dt):
+        d = self.drops; y = d.view("y")
+        d.view("prev_y")[:] = y
+        y += d.view("speed") * dt
+        d.view("alive")[:] &= y <= WIN_H
+    def _touching(self):
+        p = self.player; d = self.drops
+        x = d.view("x"); y = d.view("y"); size = d.view("size")
+        return d.view("alive") & (p.x < x + size) & (x < p.x + p.w) & (p.y < y + size) & (y < p.y + p.h)
+    def catch_fruits(self):
+        d = self.drops
+        hit = np.flatnonzero(self._touching() & (d.view("kind") != BOMB_KIND))
+        if not len(hit): return []
+        d.alive[hit] = False
+        half = d.size[hit]//2
+        return [(KINDS[k], int(x), int(y) + h) for k, x, y, h in zip(d.kind[hit], d.x[hit] + half, d.y[hit], half)]
+    def hit_bomb(self):
+        return bool((self._touching() & (self.drops.view("kind") == BOMB_KIND)).any())
+    def clear_bombs(self):
+        d = self.drops
+        d.view("alive")[:] &= d.view("kind") != BOMB_KIND
+    def cull(self):
+        self.drops.compact()
+
+# ---------- Stress benchmark ----------
+def bench(engine, count, frames, diff="Easy"):
+    g = engine(diff, seed=1, stress=count)
+    g.lives = 10**9     # stress runs measure throughput, not survival
+    for _ in range(30): g.step(1.0/FPS)
+    t = time.perf_counter()
+    for i in range(frames): g.step(1.0/FPS, (i//30) % 3 - 1)
+    return (time.perf_counter() - t) / frames * 1000.0, g.drop_count()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="list vs numpy drop engine under stress")
+    ap.add_argument("--counts", default="10,100,1000,5000,20000")
+    ap.add_argument("--frames", type=int, default=120)
+    args = ap.parse_args(argv)
+    print(f"{'drops':>7} {'list ms/frame':>14} {'numpy ms/frame':>15}")
+    for c in [int(c) for c in args.counts.split(",")]:
+        lst, n = bench(SimGame, c, args.frames); arr, _ = bench(ArrayGame, c, args.frames)
+        print(f"{n:>7} {lst:>14.3f} {arr:>15.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Vectorized batch environment: N independent Bomb & Berry games stepped per call with NumPy.
+# Same rules as sim.SimGame, laid out as arrays so bots can train without a window or frame cap.
+import numpy as np
+
+from sim import (WIN_W, WIN_H, STEP, PLAYER_SPEED_BASE, FRUIT_SPEED_BASE, BOMB_SPEED_BASE,
+                 DIFFICULTY, BONUS_DURATION, RAMP_SCORE, RAMP_MAX, PLAYER_W, PLAYER_H, FRUIT_SIZE, BOMB_SIZE)
+
+MAX_DROPS = 64      # drop slots per game; spawns are skipped while every slot is live
+OBS_DROPS = 8       # lowest drops reported in each observation
+OBS_SIZE = 4 + 4*OBS_DROPS
+
+class BatchEnv:
+    # params overrides the DIFFICULTY table: one (spawn_interval, fruit_mult, bomb_mult, lives)
+    # tuple for every game or a list with one per game; ramp replaces the score/600 ramp
+    def __init__(self, n, diff="Medium", seed=None, dt=STEP, bomb_penalty=0.0, autoreset=True,
+                 params=None, ramp=RAMP_SCORE):
+        self.n = n; self.dt = dt; self.ramp = ramp
+        self.bomb_penalty = bomb_penalty; self.autoreset = autoreset
+        self.rng = np.random.default_rng(seed)
+        if params is None:
+            diffs = [diff]*n if isinstance(diff, str) else list(diff)
+            if len(diffs) != n: raise ValueError("need one difficulty per game")
+            params = [DIFFICULTY[d] for d in diffs]
+        table = np.array(params, dtype=np.float64).reshape(-1, 4)
+        if len(table) not in (1, n): raise ValueError("need one parameter tuple, or one per game")
+        table = np.broadcast_to(table, (n, 4))
+        self.base_interval = table[:,0]; self.fruit_mult = table[:,1]; self.bomb_mult = table[:,2]
+        self.start_lives = table[:,3].astype(np.int32)
+        # per-game state
+        self.px = np.zeros(n)
+        self.score = np.zeros(n, np.int32); self.lives = np.zeros(n, np.int32)
+        self.spawn_timer = np.zeros(n); self.bonus = np.zeros(n, bool); self.bonus_timer = np.zeros(n)
+        self.time = np.zeros(n); self.done = np.zeros(n, bool)
+        self.final_score = np.zeros(n, np.int32)
+        # per-drop state, struct of arrays shaped (n, MAX_DROPS)
+        self.dx = np.zeros((n, MAX_DROPS), np.int32); self.dy = np.zeros((n, MAX_DROPS))
+        self.dspeed = np.zeros((n, MAX_DROPS), np.int32)
+        self.dbomb = np.zeros((n, MAX_DROPS), bool); self.dalive = np.zeros((n, MAX_DROPS), bool)
+        self.dsize = np.zeros((n, MAX_DROPS), np.int32)
+        self.rows = np.arange(n)
+        self._restart(np.ones(n, bool))
+
+    def reset(self, mask=None):
+        self._restart(np.ones(self.n, bool) if mask is None else mask)
+        return self.observe()
+
+    def _restart(self, m):
+        # fresh games in the masked rows; the caller observes
+        self.px[m] = WIN_W//2 - PLAYER_W//2
+        self.score[m] = 0; self.lives[m] = self.start_lives[m]
+        self.spawn_timer[m] = 0.0; self.bonus[m] = False; self.bonus_timer[m] = 0.0
+        self.time[m] = 0.0; self.done[m] = False
+        self.dalive[m] = False
+
+    def _spawn(self, dt):
+        interval = np.maximum(0.3, self.base_interval - np.minimum(RAMP_MAX, self.score/self.ramp))
+        interval = np.where(self.bonus, np.maximum(0.18, interval*0.6), interval)
+        self.spawn_timer += dt
+        due = (self.spawn_timer >= interval) & ~self.done
+        self.spawn_timer[due] = 0.0
+        slot = np.argmin(self.dalive, axis=1)
+        due &= ~self.dalive[self.rows, slot]
+        g = np.nonzero(due)[0]
+        if not len(g): return
+        s = slot[g]
+        bomb = ~self.bonus[g] & (self.rng.random(len(g)) > 0.75)
+        size = np.where(bomb, BOMB_SIZE, FRUIT_SIZE)
+        cx = self.rng.integers(28, WIN_W-28, len(g), endpoint=True)
+        base = np.where(bomb, BOMB_SPEED_BASE*self.bomb_mult[g], FRUIT_SPEED_BASE*self.fruit_mult[g])
+        jitter = self.rng.integers(-30, 30, len(g), endpoint=True)
+        self.dx[g, s] = cx - size//2; self.dy[g, s] = -40
+        self.dspeed[g, s] = (base + jitter).astype(np.int32)
+        self.dbomb[g, s] = bomb; self.dsize[g, s] = size; self.dalive[g, s] = True
+
+    def step(self, actions):
+        # actions: array of -1/0/1 per game; returns (obs, reward, done)
+        dt = self.dt; live = ~self.done
+        self.time[live] += dt
+        self._spawn(dt)
+        move = np.clip(np.asarray(actions), -1, 1) * live
+        self.px += PLAYER_SPEED_BASE * move * dt
+        np.clip(self.px, 6, WIN_W - PLAYER_W - 6, out=self.px)
+        alive = self.dalive
+        self.dy += self.dspeed * dt * live[:,None]
+        alive &= self.dy <= WIN_H
+        py = WIN_H - 40 - PLAYER_H
+        px = self.px[:,None]
+        hit = alive & (px < self.dx + self.dsize) & (self.dx < px + PLAYER_W) \
+                    & (py < self.dy + self.dsize) & (self.dy < py + PLAYER_H) & live[:,None]
+        caught = hit & ~self.dbomb
+        n_caught = caught.sum(axis=1).astype(np.int32)
+        alive &= ~caught
+        old = self.score.copy()
+        self.score += 10*n_caught
+        start_bonus = (self.score // 100) > (old // 100)
+        self.bonus |= start_bonus; self.bonus_timer[start_bonus] = BONUS_DURATION
+        bombed = (hit & self.dbomb).any(axis=1)
+        alive &= ~(self.dbomb & bombed[:,None])
+        self.lives -= bombed
+        ended = bombed & (self.lives <= 0)
+        self.done |= ended
+        ticking = self.bonus & live
+        self.bonus_timer[ticking] -= dt
+        over = ticking & (self.bonus_timer <= 0)
+        self.bonus[over] = False; self.bonus_timer[over] = 0.0
+        reward = (10*n_caught - self.bomb_penalty*bombed).astype(np.float32)
+        done = ended.copy()
+        self.final_score[ended] = self.score[ended]
+        if self.autoreset and ended.any(): self._restart(ended)
+        return self.observe(), reward, done
+
+    def observe(self):
+        # [player x, lives, bonus, score/1000] + OBS_DROPS x [dx from player, y, is bomb, present]
+        obs = np.zeros((self.n, OBS_SIZE), np.float32)
+        pcx = self.px + PLAYER_W/2
+        obs[:,0] = pcx / WIN_W; obs[:,1] = self.lives
+        obs[:,2] = self.bonus; obs[:,3] = self.score / 1000.0
+        key = np.where(self.dalive, self.dy, -10**6)
+        idx = np.argpartition(-key, OBS_DROPS-1, axis=1)[:, :OBS_DROPS]
+        order = np.argsort(-np.take_along_axis(key, idx, axis=1), axis=1)
+        idx = np.take_along_axis(idx, order, axis=1)
+        take = lambda a: np.take_along_axis(a, idx, axis=1)
+        present = take(self.dalive)
+        d = obs[:, 4:].reshape(self.n, OBS_DROPS, 4)
+        d[:,:,0] = (take(self.dx) + take(self.dsize)//2 - pcx[:,None]) / WIN_W * present
+        d[:,:,1] = take(self.dy) / WIN_H * present
+        d[:,:,2] = take(self.dbomb) & present
+        d[:,:,3] = present
+        return obs
@@ -0,0 +1,247 @@
+# Per-session gameplay event logs and an offline analyzer.
+# fruit.py --eventlog DIR appends one fixed-width binary record per spawn, catch, bomb hit,
+# bonus start/end and game over to a file per session. Records are packed into
+# an in-memory buffer and handed to a background writer, so logging never waits on disk.
+# `python eventlog.py DIR...` memory-maps the files and aggregates them with numpy.
+import argparse, glob, mmap, os, struct, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+from sim import WIN_W, WIN_H, STEP, FRUIT_NAMES, DIFFS, KINDS
+from writer import BackgroundWriter
+
+MAGIC = b"BBEV"; VERSION = 1
+HEADER = struct.Struct("<4sBBHQdd")     # magic, version, difficulty, record size, seed, step, start time
+RECORD = struct.Struct("<IBBhhI")       # tick, type, kind, x, y, value
+NO_KIND = 255
+
+# event types; x, y are logical pixel coordinates
+SPAWN = 1           # drop centre at spawn, value = fall speed
+CATCH = 2           # fruit centre, value = score after the catch
+BOMB_HIT = 3        # player centre, value = lives left
+BONUS_START = 4     # value = score
+BONUS_END = 5       # value = score
+GAME_OVER = 6       # value = final score
+TYPES = {SPAWN: "spawn", CATCH: "catch", BOMB_HIT: "bomb_hit", BONUS_START: "bonus_start",
+         BONUS_END: "bonus_end", GAME_OVER: "game_over"}
+KIND_CODE = {name: i for i, name in enumerate(KINDS)}
+
+# ---------- Writing ----------
+class SessionLog:
+    # one game; record() turns one sim step's events into packed records
+    def __init__(self, log, path, diff, seed):
+        self.log = log; self.path = path; self.closed = False
+        self.buf = bytearray(HEADER.pack(MAGIC, VERSION, DIFFS.index(diff), RECORD.size, seed, STEP, time.time()))
+        self.records = 0
+    def emit(self, tick, kind, code, x, y, value):
+        self.buf += RECORD.pack(tick, kind, code, x, y, value); self.records += 1
+        if len(self.buf) >= self.log.chunk: self.flush()
+    def record(self, tick, events, score, lives):
+        # tick, score and lives are the sim's right after the step that produced the events
+        emit = self.emit
+        for ev, data in events:
+            if ev == "spawn":
+                emit(tick, SPAWN, KIND_CODE[data.name], data.x + data.w//2, round(data.y), max(0, data.speed))
+            elif ev == "catch":
+                for name, cx, cy in data: emit(tick, CATCH, KIND_CODE[name], cx, cy, score)
+            elif ev == "bomb":
+                emit(tick, BOMB_HIT, NO_KIND, data[0], data[1], max(0, lives))
+            elif ev == "bonus_start": emit(tick, BONUS_START, NO_KIND, 0, 0, score)
+            elif ev == "bonus_end": emit(tick, BONUS_END, NO_KIND, 0, 0, score)
+            elif ev == "gameover":
+                emit(tick, GAME_OVER, NO_KIND, 0, 0, data); self.close()
+    def flush(self):
+        if self.buf:
+            self.log.submit(self.path, self.buf); self.buf = bytearray()
+    def close(self):
+        if not self.closed:
+            self.closed = True; self.flush(); self.log.sessions.discard(self)
+
+class EventLog:
+    # owns the writer thread; full session buffers queue up here and are appended in order
+    def __init__(self, folder, chunk=64*1024):
+        self.folder = folder; self.chunk = chunk
+        os.makedirs(folder, exist_ok=True)
+        self.closed = False; self.sessions = set(); self.n = 0
+        self.writer = BackgroundWriter(self._append, "eventlog-writer")
+    def session(self, diff, seed):
+        self.n += 1
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self.n}-{diff}.bbev"
+        s = SessionLog(self, os.path.join(self.folder, name), diff, seed)
+        self.sessions.add(s)
+        return s
+    def submit(self, path, data):
+        self.writer.submit((path, data))
+    def _append(self, item):
+        path, data = item
+        try:
+            with open(path, "ab") as f: f.write(data)
+        except OSError:
+            pass        # a full disk loses log data, not the game
+    def close(self, timeout=5.0):
+        # unfinished sessions are flushed as they are (no game-over record)
+        if self.closed: return
+        for s in list(self.sessions): s.close()
+        self.closed = True
+        self.writer.close(timeout)
+
+# ---------- Reading ----------
+def record_dtype():
+    import numpy as np
+    return np.dtype([("tick", "<u4"), ("type", "u1"), ("kind", "u1"), ("x", "<i2"), ("y", "<i2"), ("value", "<u4")])
+
+def read_header(buf):
+    magic, version, diff, size, seed, step, started = HEADER.unpack_from(buf)
+    if magic != MAGIC or version != VERSION or size != RECORD.size: raise ValueError("not a v1 event log")
+    return {"difficulty": DIFFS[diff], "seed": seed, "step": step, "started": started}
+
+# ---------- Analysis ----------
+class Totals:
+    # sums over many sessions; adding two Totals merges worker results
+    def __init__(self, cell):
+        import numpy as np
+        self.cell = cell; self.nx = -(-WIN_W // cell); self.ny = -(-WIN_H // cell)
+        z = lambda *shape: np.zeros(shape, np.int64)
+        nd, nk = len(DIFFS), len(KINDS)
+        self.sessions = z(nd); self.finished = z(nd); self.steps = z(nd)
+        self.spawned = z(nd, nk); self.caught = z(nd, nk); self.hits = z(nd); self.bonuses = z(nd)
+        self.spawn_x = z(self.nx); self.spawn_minute = z(60)
+        self.catch_map = z(self.ny, self.nx); self.hit_map = z(self.ny, self.nx)
+        self.scores = [[] for _ in DIFFS]; self.records = 0; self.bad = []
+    def __iadd__(self, o):
+        for k, v in vars(o).items():
+            if k in ("cell", "nx", "ny"): continue
+            if k == "scores":
+                for a, b in zip(self.scores, v): a += b
+            elif k == "bad": self.bad += v
+            else: setattr(self, k, getattr(self, k) + v)
+        return self
+    def cells(self, x, y):
+        import numpy as np
+        ix = np.clip(x // self.cell, 0, self.nx-1); iy = np.clip(y // self.cell, 0, self.ny-1)
+        return (iy * self.nx + ix).astype(np.intp)
+    def add(self, head, r):
+        import numpy as np
+        d = DIFFS.index(head["difficulty"]); nk = len(KINDS)
+        t = r["type"]; kind = r["kind"].astype(np.intp)
+        x = r["x"].astype(np.int64); y = r["y"].astype(np.int64)
+        self.sessions[d] += 1; self.records += len(r)
+        self.steps[d] += int(r["tick"][-1]) if len(r) else 0
+        over = t == GAME_OVER
+        if over.any(): self.finished[d] += 1; self.scores[d].append(int(r["value"][over][-1]))
+        sp = t == SPAWN
+        self.spawned[d] += np.bincount(kind[sp], minlength=nk)[:nk]
+        self.spawn_x += np.bincount(np.clip(x[sp] // self.cell, 0, self.nx-1), minlength=self.nx)
+        minute = np.minimum(r["tick"][sp] * head["step"] // 60, 59).astype(np.intp)
+        self.spawn_minute += np.bincount(minute, minlength=60)
+        c = t == CATCH
+        self.caught[d] += np.bincount(kind[c], minlength=nk)[:nk]
+        self.catch_map += np.bincount(self.cells(x[c], y[c]), minlength=self.nx*self.ny).reshape(self.ny, self.nx)
+        h = t == BOMB_HIT
+        self.hits[d] += int(h.sum())
+        self.hit_map += np.bincount(self.cells(x[h], y[h]), minlength=self.nx*self.ny).reshape(self.ny, self.nx)
+        self.bonuses[d] += int((t == BONUS_START).sum())
+
+def scan(paths, cell=40):
+    # worker: one mmap per file, records viewed in place (no copy); Totals for the batch
+    import numpy as np
+    dt = record_dtype(); tot = Totals(cell)
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size < HEADER.size: raise ValueError("truncated header")
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    head = read_header(mm)
+                    r = np.frombuffer(mm, dt, (size - HEADER.size) // RECORD.size, HEADER.size)
+                    tot.add(head, r)
+                    del r       # the mmap can't close while a view exports it
+        except (OSError, ValueError) as e:
+            tot.bad.append(f"{path}: {e}")
+    return tot
+
+def find_logs(items):
+    out = []
+    for item in items:
+        if os.path.isdir(item): out += sorted(glob.glob(os.path.join(item, "**", "*.bbev"), recursive=True))
+        else: out.append(item)
+    return out
+
+def analyze(paths, cell=40, workers=1, batch=256):
+    tot = Totals(cell)
+    batches = [paths[i:i+batch] for i in range(0, len(paths), batch)]
+    if workers <= 1 or len(batches) <= 1:
+        for b in batches: tot += scan(b, cell)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            for part in pool.map(scan, batches, [cell]*len(batches)): tot += part
+    return tot
+
+def summarize(tot):
+    import numpy as np
+    rows = {}
+    for d, diff in enumerate(DIFFS):
+        if not tot.sessions[d]: continue
+        minutes = tot.steps[d] * STEP / 60.0
+        fruit_sp = tot.spawned[d, :-1].sum(); fruit_c = tot.caught[d, :-1].sum()
+        scores = np.array(tot.scores[d]) if tot.scores[d] else np.zeros(1)
+        rows[diff] = {"sessions": int(tot.sessions[d]), "finished": int(tot.finished[d]), "play_min": float(minutes),
+                      "spawns_per_min": float(tot.spawned[d].sum() / max(minutes, 1e-9)),
+                      "bomb_share": float(tot.spawned[d, -1] / max(tot.spawned[d].sum(), 1)),
+                      "catch_rate": float(fruit_c / max(fruit_sp, 1)),
+                      "hits_per_min": float(tot.hits[d] / max(minutes, 1e-9)),
+                      "bonuses_per_session": float(tot.bonuses[d] / tot.sessions[d]),
+                      "score_p50": float(np.percentile(scores, 50)), "score_p90": float(np.percentile(scores, 90))}
+    sp = tot.spawned.sum(axis=0); ca = tot.caught.sum(axis=0)
+    kinds = {k: {"spawned": int(sp[i]), "caught": int(ca[i]), "catch_rate": float(ca[i] / max(sp[i], 1))}
+             for i, k in enumerate(FRUIT_NAMES)}
+    return {"sessions": int(tot.sessions.sum()), "records": int(tot.records), "difficulties": rows, "fruits": kinds,
+            "cell": tot.cell, "spawn_x": tot.spawn_x.tolist(), "spawns_by_minute": tot.spawn_minute.tolist(),
+            "catch_heatmap": tot.catch_map.tolist(), "hit_heatmap": tot.hit_map.tolist(), "unreadable": tot.bad}
+
+SHADES = " .:-=+*#%@"
+
+def shade_rows(grid):
+    # one text row per grid row that has anything in it, darker = more
+    peak = max(max(r) for r in grid) or 1
+    return [(i, "".join(SHADES[min(len(SHADES)-1, -(-v * (len(SHADES)-1) // peak))] for v in r))
+            for i, r in enumerate(grid) if any(r)]
+
+def print_report(s, cell):
+    print(f"{'difficulty':<10} {'sessions':>8} {'ended':>6} {'play min':>9} {'spawns/min':>10} {'bombs':>6} "
+          f"{'catch rate':>10} {'hits/min':>8} {'bonus/game':>10} {'score p50/p90':>14}")
+    for diff, r in s["difficulties"].items():
+        print(f"{diff:<10} {r['sessions']:>8} {r['finished']:>6} {r['play_min']:>9.1f} {r['spawns_per_min']:>10.1f} "
+              f"{r['bomb_share']*100:>5.1f}% {r['catch_rate']*100:>9.1f}% {r['hits_per_min']:>8.2f} "
+              f"{r['bonuses_per_session']:>10.2f} {r['score_p50']:>6.0f}/{r['score_p90']:<7.0f}")
+    print("fruit      " + "  ".join(f"{k} {v['caught']}/{v['spawned']} ({v['catch_rate']*100:.0f}%)" for k, v in s["fruits"].items()))
+    total = sum(s["spawn_x"]) or 1
+    print(f"spawn x, % per {cell}px column: " + " ".join(f"{v*100/total:.1f}" for v in s["spawn_x"]))
+    mins = s["spawns_by_minute"]; last = max([i for i, v in enumerate(mins) if v] or [0])
+    print("spawns by game minute: " + "  ".join(f"{i}:{v}" for i, v in enumerate(mins[:last+1])))
+    for title, grid in (("catch", s["catch_heatmap"]), ("bomb hit", s["hit_heatmap"])):
+        print(f"{title} heatmap ({cell}px cells, rows by y):")
+        for i, row in shade_rows(grid): print(f"  {i*cell:>4} |{row}|")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="aggregate fruit.py --eventlog session files")
+    ap.add_argument("logs", nargs="+", help="event log files or directories holding them")
+    ap.add_argument("--cell", type=int, default=40, help="heatmap / spawn column size in pixels")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--json", metavar="FILE", help="also write the summary with the full heatmaps")
+    args = ap.parse_args(argv)
+    if args.cell <= 0: ap.error("--cell must be positive")
+    paths = find_logs(args.logs)
+    if not paths: ap.error("no .bbev files found")
+    t = time.perf_counter()
+    s = summarize(analyze(paths, args.cell, args.workers))
+    wall = time.perf_counter() - t
+    print_report(s, args.cell)
+    print(f"{s['sessions']} sessions, {s['records']:,} events from {len(paths)} files in {wall:.2f}s")
+    for msg in s["unreadable"][:5]: print("skipped", msg)
+    if args.json:
+        import json
+        with open(args.json, "w") as f: json.dump(s, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,19 @@
 
-import pygame, random, sys, math, json, os, time
+import pygame, random, sys, math, os, time, argparse, atexit, threading, socket, importlib.util
+from collections import OrderedDict
 
-# Optional numpy for runtime sound generation
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except Exception:
-    NUMPY_AVAILABLE = False
+# Optional numpy (numpy engine, sound synthesis); only looked up here, imported on first use
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
 
 # ---------- CONFIG ----------
-WIN_W, WIN_H = 820, 820
-FPS = 60
+from sim import WIN_W, WIN_H, FPS, STEP, LEFT, IDLE, RIGHT, DIFFS, KINDS, SimGame, lerp
+from replay import InputRecorder
+from profiler import Profiler, Telemetry
+from leaderboard import Leaderboard
+from sounds import SoundBank
+from eventlog import EventLog
+import netproto as net
 
-PLAYER_SPEED_BASE = 420
-FRUIT_SPEED_BASE = 190
-BOMB_SPEED_BASE = 260
-
-DIFFICULTY = {
-    "Easy":    (1.2, 0.90, 0.90, 4),
-    "Medium":  (0.9, 1.00, 1.00, 3),
-    "Hard":    (0.7, 1.15, 1.25, 2)
-}
-
-BONUS_DURATION = 8.0
 HIGHSCORE_FILE = "highscores.json"
 
 # Colors
@@ -33,6 +24,8 @@ BUTTON = (40, 160, 80)
 BUTTON_H = (64, 210, 110)
 TEXTBOX_COLOR = (255,255,255)
 CURSOR_COLOR = (20,20,20)
+GAME_SKY = (180,220,255)
+GROUND = (72,170,90)
 
 pygame.init()
 screen = pygame.display.set_mode((WIN_W, WIN_H))
@@ -42,52 +35,107 @@ font = pygame.font.SysFont(None, 24)
 big_font = pygame.font.SysFont(None, 44)
 title_font = pygame.font.SysFont(None, 60)
 
+# ---------- View ----------
+# everything is laid out in logical WIN_W x WIN_H coordinates and drawn into view.canvas at
+# view.scale times that size; present() scales the canvas to the window. When canvas and
+# window are the same size the canvas *is* the window and presenting costs nothing.
+# Images built at logical size go through view.image(); every rescale bumps view.version so
+# sprites, layers and HUD text regenerate theirs.
+SCALE_MIN, SCALE_MAX, SCALE_STEP = 0.5, 2.0, 0.25
+
+class View:
+    def __init__(self, window):
+        self.window=window; self.canvas=window; self.scale=1.0; self.version=0
+        self.smooth=True; self.fonts={}
+    def set_window(self, scale):
+        # window size as a multiple of the logical layout; the canvas is rebuilt to match
+        self.window = pygame.display.set_mode((round(WIN_W*scale), round(WIN_H*scale)))
+        self.set_scale(self.scale, force=True)
+    def set_scale(self, scale, force=False):
+        scale = min(SCALE_MAX, max(SCALE_MIN, scale))
+        if scale == self.scale and not force: return
+        size = (round(WIN_W*scale), round(WIN_H*scale))
+        self.scale = scale; self.version += 1
+        self.canvas = self.window if size == self.window.get_size() else pygame.Surface(size).convert()
+        for c in clouds: c.rescale()
+    def px(self, v):
+        return round(v*self.scale)
+    def pos(self, x, y):
+        return (round(x*self.scale), round(y*self.scale))
+    def rect(self, r):
+        x,y,w,h = r; s = self.scale
+        return pygame.Rect(round(x*s), round(y*s), round(w*s), round(h*s))
+    def font(self, size):
+        # default font at size*scale; at 1x these are the module fonts, so text caches are shared
+        px = max(6, self.px(size))
+        fnt = self.fonts.get(px)
+        if fnt is None: fnt = self.fonts[px] = pygame.font.SysFont(None, px)
+        return fnt
+    def image(self, surf):
+        if self.scale == 1.0: return surf
+        w,h = surf.get_size()
+        return pygame.transform.smoothscale(surf, (max(1, self.px(w)), max(1, self.px(h))))
+    def mouse(self):
+        # window pixels -> logical coordinates
+        mx,my = pygame.mouse.get_pos(); w,h = self.window.get_size()
+        return (mx*WIN_W//w, my*WIN_H//h)
+    def present(self):
+        if self.canvas is self.window: return
+        scale = pygame.transform.smoothscale if self.smooth else pygame.transform.scale
+        scale(self.canvas, self.window.get_size(), self.window)
+    def flip(self, rects=None):
+        # rects are canvas rects, only usable when nothing is scaled
+        if rects is None or self.canvas is not self.window: pygame.display.flip()
+        else: pygame.display.update(rects)
+
+view = View(screen)
+view.fonts.update({24: font, 44: big_font, 60: title_font})
+
+def display_format():
+    # what convert()/convert_alpha() results depend on; set_mode hands back the same Surface
+    # object for every mode, so caches can't key on the display surface itself
+    s = pygame.display.get_surface()
+    return s and (s.get_size(), s.get_bitsize(), s.get_flags())
+
 # ---------- Sounds ----------
-def make_sound_tone(freq=440.0, dur=0.12, vol=0.4, sr=44100):
-    if not NUMPY_AVAILABLE:
-        return None
-    t = np.linspace(0, dur, int(sr*dur), False)
-    tone = np.sin(2*np.pi*freq*t)
-    # simple envelope
-    env = np.exp(-3*t)
-    samples = (tone * env * vol * (2**15-1)).astype(np.int16)
-    stereo = np.column_stack((samples, samples))
-    try:
-        return pygame.mixer.Sound(stereo)
-    except Exception:
-        return None
+# synthesized on first use or by sounds.warm() in main(); cached on disk between runs
+sounds = SoundBank()
 
-catch_sound = make_sound_tone(880.0,0.09,0.25)
-explosion_sound = make_sound_tone(120.0,0.35,0.7)
-gameover_sound = make_sound_tone(200.0,0.6,0.6)
-def play_sound(s):
-    try:
-        if s: s.play()
-    except Exception:
-        pass
+def play_sound(name):
+    sounds.play(name)
 
 # ---------- Highscore helpers ----------
-def load_highscores():
-    try:
-        if os.path.isfile(HIGHSCORE_FILE):
-            with open(HIGHSCORE_FILE,"r") as f:
-                return json.load(f)
-    except Exception:
-        pass
-    return []
-
-def save_highscores(scores):
-    try:
-        with open(HIGHSCORE_FILE,"w") as f:
-            json.dump(scores,f,indent=2)
-    except Exception:
-        pass
+# read once at startup; the game-over frame only inserts in memory, the file is written off-thread
+leaderboard = Leaderboard(HIGHSCORE_FILE)
+atexit.register(leaderboard.close)
 
 def add_highscore(name, score, diff):
-    scores = load_highscores()
-    scores.append({"name":name,"score":score,"difficulty":diff,"time":time.strftime("%Y-%m-%d %H:%M")})
-    scores = sorted(scores, key=lambda x: x["score"], reverse=True)[:5]
-    save_highscores(scores)
+    return leaderboard.add(name, score, diff)
+
+# ---------- Text cache ----------
+# rendered text surfaces keyed by (font, string, color, antialias) with LRU eviction;
+# returned surfaces are shared and must not be drawn on
+class TextCache:
+    def __init__(self, maxsize=256):
+        self.maxsize=maxsize; self.surfs=OrderedDict()
+        self.hits=0; self.misses=0
+    def render(self, fnt, text, color, antialias=True):
+        key=(fnt, text, color, antialias)
+        surf=self.surfs.get(key)
+        if surf is not None:
+            self.hits+=1; self.surfs.move_to_end(key)
+            return surf
+        self.misses+=1
+        surf=self.surfs[key]=fnt.render(text, antialias, color)
+        if len(self.surfs) > self.maxsize: self.surfs.popitem(last=False)
+        return surf
+    def stats(self):
+        return {"hits":self.hits, "misses":self.misses, "size":len(self.surfs)}
+
+text_cache = TextCache()
+
+def render_text(fnt, text, color, antialias=True):
+    return text_cache.render(fnt, text, color, antialias)
 
 # ---------- UI helpers ----------
 def draw_button(surface, rect, text, mouse_pos):
@@ -95,7 +143,7 @@ def draw_button(surface, rect, text, mouse_pos):
     hovered = x < mouse_pos[0] < x+w and y < mouse_pos[1] < y+h
     color = BUTTON_H if hovered else BUTTON
     pygame.draw.rect(surface, color, rect, border_radius=8)
-    txt = font.render(text, True, (0,0,0))
+    txt = render_text(font, text, (0,0,0))
     surface.blit(txt, (x + (w - txt.get_width())//2, y + (h - txt.get_height())//2))
     return hovered
 
@@ -104,37 +152,76 @@ def draw_panel(surface, rect):
     pygame.draw.rect(surface, (220,220,220), rect, width=1, border_radius=10)
 
 # ---------- Clouds ----------
-class Cloud:
+class Cloud(pygame.sprite.DirtySprite):
     def __init__(self):
+        super().__init__()
         self.w = random.randint(120,260)
         self.h = self.w//3
         self.x = random.randint(-self.w, WIN_W)
         self.y = random.randint(10, WIN_H//2)
         self.speed = random.uniform(8, 36)
         self.alpha = random.randint(120,220)
+        self.rescale(1.0)
+    def rescale(self, scale=None):
+        # baked per render scale; size and alpha never change, wrapping only moves the blit offset
+        s = view.scale if scale is None else scale
+        w, h = max(1, round(self.w*s)), max(1, round(self.h*s))
+        self.image = pygame.Surface((w,h), pygame.SRCALPHA)
+        pygame.draw.ellipse(self.image, (255,255,255,self.alpha), (0,0,w,h))
+        if pygame.display.get_surface(): self.image = self.image.convert_alpha()
+        self.rect = self.image.get_rect(topleft=(int(self.x*s), int(self.y*s))); self.dirty = 1
     def update(self, dt, wind=1.0):
         self.x += self.speed * dt * wind
         if self.x - self.w > WIN_W:
             self.x = -self.w - random.randint(0,100)
             self.y = random.randint(10, WIN_H//2)
+        s = view.scale
+        pos = (int(self.x*s), int(self.y*s))
+        if pos != self.rect.topleft:
+            self.rect.topleft = pos; self.dirty = 1
     def draw(self,s):
-        surf = pygame.Surface((self.w,self.h), pygame.SRCALPHA)
-        pygame.draw.ellipse(surf, (255,255,255,self.alpha), (0,0,self.w,self.h))
-        s.blit(surf, (self.x, self.y))
+        s.blit(self.image, self.rect)
 
 clouds = [Cloud() for _ in range(6)]
 
-# ---------- Player ----------
-class Player(pygame.sprite.Sprite):
+# ---------- Background ----------
+# static sky (+ ground strip) composited once per colour; clouds are blitted on top
+class Backgrounds:
     def __init__(self):
+        self.layers = {}; self.target = None; self.version = None
+    def get(self, sky, ground=None):
+        if display_format() != self.target or view.version != self.version:
+            self.layers.clear(); self.target = display_format(); self.version = view.version
+        layer = self.layers.get((sky,ground))
+        if layer is None:
+            w, h = view.canvas.get_size()
+            layer = pygame.Surface((w,h)); layer.fill(sky)
+            if ground: top = view.px(WIN_H-36); pygame.draw.rect(layer,ground,(0,top,w,h-top))
+            if self.target: layer = layer.convert()
+            self.layers[(sky,ground)] = layer
+        return layer
+
+backgrounds = Backgrounds()
+
+def draw_background(surf, sky, ground=None, with_clouds=True):
+    surf.blit(backgrounds.get(sky,ground), (0,0))
+    if with_clouds:
+        for c in clouds: c.draw(surf)
+
+# ---------- Player ----------
+class Player(pygame.sprite.DirtySprite):
+    def __init__(self, body):
         super().__init__()
-        self.frames = [self.make_frame(0), self.make_frame(1)]
+        self.body = body; self.dirty = 2
+        self.rescale()
         self.frame_idx = 0
         self.anim_timer = 0.0
         self.anim_speed = 0.12
         self.image = self.frames[0]
-        self.rect = self.image.get_rect(midbottom=(WIN_W//2, WIN_H-40))
-        self.vx = 0
+        self.rect = self.image.get_rect(topleft=view.pos(body.x, body.y))
+    def rescale(self):
+        self.frames = [view.image(self.make_frame(0)), view.image(self.make_frame(1))]
+        self.version = view.version
     def make_frame(self, stance=0):
         surf = pygame.Surface((80,90), pygame.SRCALPHA)
         pygame.draw.circle(surf, (240,200,170),(40,22),12)
@@ -150,18 +237,10 @@ class Player(pygame.sprite.Sprite):
             pygame.draw.line(surf,(30,30,80),(30,72),(24,86),6)
             pygame.draw.line(surf,(30,30,80),(50,72),(56,86),6)
         return surf
-    def update(self, dt):
-        keys=pygame.key.get_pressed()
-        moving=False; self.vx=0
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.vx = -PLAYER_SPEED_BASE
-            moving=True
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.vx = PLAYER_SPEED_BASE
-            moving=True
-        self.rect.x += int(self.vx * dt)
-        self.rect.x = max(6, min(WIN_W - self.rect.width - 6, self.rect.x))
-        if moving:
+    def update(self, dt, alpha=1.0):
+        if self.version != view.version: self.rescale(); self.rect.size = self.frames[0].get_size()
+        self.rect.topleft = view.pos(lerp(self.body.prev_x, self.body.x, alpha), self.body.y)
+        if self.body.vx:
             self.anim_timer += dt
             if self.anim_timer >= self.anim_speed:
                 self.anim_timer -= self.anim_speed
@@ -171,21 +250,40 @@ class Player(pygame.sprite.Sprite):
         self.image = self.frames[self.frame_idx]
 
 # ---------- Explosion ----------
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self,pos):
+EXPLOSION_R = 80; EXPLOSION_TIME = 0.6
+EXPLOSION_FRAMES = round(EXPLOSION_TIME*FPS)     # one pre-rendered frame per 60 FPS tick
+
+def draw_explosion(surf, t):
+    # t in [0,1): the blast grows to full radius while fading out
+    m = EXPLOSION_R; r = int(m * t); a = int(255*(1-t))
+    pygame.draw.circle(surf,(255,255,200,a),(m,m),int(r*0.5))
+    pygame.draw.circle(surf,(255,160,0,a),(m,m),int(r*0.8))
+    pygame.draw.circle(surf,(220,40,40,a),(m,m),r)
+
+class Explosion(pygame.sprite.DirtySprite):
+    # pooled: start() rearms a finished sprite, which returns itself to explosion_pool
+    def __init__(self):
         super().__init__()
-        self.pos = pos; self.timer=0.0; self.duration=0.6; self.maxr=80
-        self.image = pygame.Surface((self.maxr*2,self.maxr*2), pygame.SRCALPHA)
-        self.rect = self.image.get_rect(center=pos)
+        self.dirty = 2; self.timer = 0.0; self.duration = EXPLOSION_TIME
+        self.frames = atlas.strip("Explosion")
+        self.image = self.frames[0]; self.rect = self.image.get_rect()
+    def start(self, pos):
+        self.timer = 0.0; self.pos = pos; self.version = view.version
+        self.frames = atlas.strip("Explosion"); self.place()
+        return self
+    def place(self):
+        self.image = self.frames[0]; self.rect.size = self.image.get_size(); self.rect.center = view.pos(*self.pos)
+    def recycle(self):
+        self.kill(); explosion_pool.release(self)
     def update(self, dt):
         self.timer += dt
         t = self.timer / self.duration
-        if t>=1.0: self.kill(); return
-        r = int(self.maxr * t); a = int(255*(1-t))
-        self.image.fill((0,0,0,0))
-        pygame.draw.circle(self.image,(255,255,200,a),(self.maxr,self.maxr),int(r*0.5))
-        pygame.draw.circle(self.image,(255,160,0,a),(self.maxr,self.maxr),int(r*0.8))
-        pygame.draw.circle(self.image,(220,40,40,a),(self.maxr,self.maxr),r)
+        if t>=1.0:
+            self.recycle(); return
+        if self.version != view.version:
+            # render scale changed mid-blast
+            self.version = view.version; self.frames = atlas.strip("Explosion"); self.place()
+        self.image = self.frames[min(len(self.frames)-1, int(t*len(self.frames)))]
 
 # ---------- Fruit drawing ----------
 def draw_apple(surf,color):
@@ -205,249 +303,706 @@ def draw_grape(surf,color):
 def draw_cherry(surf,color):
     pygame.draw.circle(surf,color,(12,22),8); pygame.draw.circle(surf,color,(26,22),8)
     pygame.draw.line(surf,(120,70,20),(18,6),(18,18),3)
+def draw_bomb(surf,color):
+    pygame.draw.circle(surf,color,(20,20),16); pygame.draw.rect(surf,(255,170,70),(18,2,4,7))
 
 FRUITS = [("Apple",(200,40,40),draw_apple),
           ("Banana",(240,220,60),draw_banana),
           ("Orange",(255,140,0),draw_orange),
           ("Grape",(120,30,120),draw_grape),
           ("Cherry",(220,20,60),draw_cherry)]
+BOMB = ("Bomb",(40,40,40),draw_bomb)
+
+# ---------- Sprite atlas ----------
+# one shared image per fruit/bomb type; sprites reference these instead of drawing their own
+class SpriteAtlas:
+    def __init__(self):
+        self.images = {}; self.strips = {}; self.target = None; self.version = None
+    def build(self):
+        self.target = display_format(); self.version = view.version
+        self.images.clear(); self.strips.clear()
+        for name,color,fn in FRUITS + [BOMB]:
+            size = 40 if name=="Bomb" else 44
+            surf = pygame.Surface((size,size), pygame.SRCALPHA); fn(surf,color)
+            self.images[name] = self.bake(surf)
+        # animations are strips of frames indexed by normalized time
+        strip = []
+        for i in range(EXPLOSION_FRAMES):
+            surf = pygame.Surface((EXPLOSION_R*2,EXPLOSION_R*2), pygame.SRCALPHA)
+            draw_explosion(surf, i/EXPLOSION_FRAMES); strip.append(self.bake(surf))
+        self.strips["Explosion"] = strip
+    def bake(self, surf):
+        # drawn at logical size, scaled to the render scale
+        surf = view.image(surf)
+        return surf.convert_alpha() if self.target else surf
+    def fresh(self):
+        # rebuilt on first use and whenever the display mode or render scale changes
+        if not self.images or display_format() != self.target or view.version != self.version: self.build()
+    def get(self, name):
+        self.fresh(); return self.images[name]
+    def strip(self, name):
+        self.fresh(); return self.strips[name]
+
+atlas = SpriteAtlas()
 
 # ---------- Fruit/Bomb sprites ----------
-class Fruit(pygame.sprite.Sprite):
-    def __init__(self, speed_mult=1.0):
+# sprites mirror a sim.Drop; the simulation owns movement and lifetime
+class DropSprite(pygame.sprite.DirtySprite):
+    # pooled: bind() points a spare sprite at a freshly rolled drop, picking up its type,
+    # position and speed; a dead drop sends the sprite back to its pool
+    pool = None; default = None
+    def __init__(self):
         super().__init__()
-        typ = random.choice(FRUITS)
-        self.name=typ[0]; color=typ[1]; fn=typ[2]
-        self.image=pygame.Surface((44,44), pygame.SRCALPHA)
-        fn(self.image,color)
-        self.rect=self.image.get_rect(midtop=(random.randint(28, WIN_W-28), -40))
-        self.speed=int(FRUIT_SPEED_BASE*speed_mult + random.randint(-30,30))
-    def update(self,dt=1/FPS):
-        self.rect.y += int(self.speed * dt)
-        if self.rect.top > WIN_H: self.kill()
-
-class Bomb(pygame.sprite.Sprite):
-    def __init__(self, speed_mult=1.0):
+        self.drop=None; self.name=self.default; self.dirty=2
+        self.image=atlas.get(self.default); self.rect=self.image.get_rect()
+    def bind(self, drop):
+        self.drop=drop; self.name=drop.name
+        self.image=atlas.get(drop.name); self.rect.size=self.image.get_size(); self.version=view.version
+        self.rect.topleft=view.pos(drop.x, drop.y)
+        return self
+    def update(self,dt=1/FPS,alpha=1.0):
+        if self.version != view.version:
+            self.image=atlas.get(self.name); self.rect.size=self.image.get_size(); self.version=view.version
+        self.rect.topleft = view.pos(self.drop.x, lerp(self.drop.prev_y, self.drop.y, alpha))
+        if not self.drop.alive: self.recycle()
+    def recycle(self):
+        self.kill(); self.drop=None; self.pool.release(self)
+
+class Fruit(DropSprite):
+    default = "Apple"
+
+class Bomb(DropSprite):
+    default = "Bomb"
+
+# ---------- Sprite pools ----------
+# finished sprites wait on a free list and are rearmed instead of reallocated, so a long
+# session allocates sprites only until the pools cover its peak on-screen count
+class SpritePool:
+    def __init__(self, factory):
+        self.factory = factory; self.free = []
+        self.allocated = 0; self.reused = 0
+    def acquire(self):
+        if self.free:
+            self.reused += 1; return self.free.pop()
+        self.allocated += 1
+        return self.factory()
+    def release(self, sprite):
+        self.free.append(sprite)
+    def reserve(self, n):
+        # allocate up front so the first seconds of play don't
+        while self.allocated < n:
+            self.allocated += 1; self.free.append(self.factory())
+    def stats(self):
+        return {"live": self.allocated - len(self.free), "free": len(self.free),
+                "allocated": self.allocated, "reused": self.reused}
+
+explosion_pool = SpritePool(Explosion)
+Fruit.pool = fruit_pool = SpritePool(Fruit)
+Bomb.pool = bomb_pool = SpritePool(Bomb)
+POOLS = {"fruit": fruit_pool, "bomb": bomb_pool, "explosion": explosion_pool}
+
+def pool_totals():
+    # (live, allocated) summed over all pools, for the overlay and telemetry
+    return (sum(p.allocated - len(p.free) for p in POOLS.values()), sum(p.allocated for p in POOLS.values()))
+
+# ---------- HUD ----------
+# a line of HUD text that re-renders only when its string or the render scale changes;
+# size and anchor are logical
+class HudText(pygame.sprite.DirtySprite):
+    def __init__(self, size, color, **anchor):
         super().__init__()
-        self.image=pygame.Surface((40,40), pygame.SRCALPHA)
-        pygame.draw.circle(self.image,(40,40,40),(20,20),16); pygame.draw.rect(self.image,(255,170,70),(18,2,4,7))
-        self.rect=self.image.get_rect(midtop=(random.randint(28, WIN_W-28), -40))
-        self.speed = int(BOMB_SPEED_BASE*speed_mult + random.randint(-30,30))
-    def update(self,dt=1/FPS):
-        self.rect.y += int(self.speed * dt)
-        if self.rect.top > WIN_H: self.kill()
+        self.size=size; self.color=color; self.anchor=anchor; self.text=None; self.version=None
+        self.image=pygame.Surface((0,0)); self.rect=self.image.get_rect()
+    def set(self, text, visible=True):
+        if visible != bool(self.visible): self.visible = int(visible); self.dirty = 1
+        if not visible or (text == self.text and self.version == view.version): return
+        self.text=text; self.version=view.version
+        self.image=render_text(view.font(self.size), text, self.color)
+        self.rect=self.image.get_rect(**{k: view.pos(*v) for k,v in self.anchor.items()}); self.dirty=1
 
 # ---------- Game manager ----------
+# front end over sim.SimGame: turns sim events into sprites, sounds and highscores
+# engine "sprites" keeps one sprite per drop; "numpy" (entities.ArrayGame) stores drops
+# in arrays and draws them straight from the atlas, which is what --stress needs
+# the sim advances in fixed STEP increments from accumulated frame time; sprites are drawn
+# interpolated between the last two steps, and every step's move goes to the input recorder
 class Game:
-    def __init__(self, name, diff):
-        self.name=name; self.diff=diff
-        self.spawn_interval, self.fruit_mult, self.bomb_mult, self.lives = DIFFICULTY[diff]
-        self.player=Player()
+    def __init__(self, name, diff, engine="sprites", stress=0, seed=None, sim=None):
+        self.name=name; self.diff=diff; self.engine=engine
+        self.seed = random.getrandbits(32) if seed is None else seed
+        if sim is not None:
+            self.sim=sim
+        elif engine=="numpy":
+            from entities import ArrayGame
+            self.sim=ArrayGame(diff, self.seed, stress); self.kinds=KINDS
+        else:
+            self.sim=SimGame(diff, self.seed, stress)
+        self.recorder=InputRecorder(diff, self.seed)
+        self.acc=0.0; self.alpha=1.0; self.on_game_over=None
+        self.tick=0; self.log=None     # log: eventlog.SessionLog, set by main() for --eventlog
+        self.sim.prof=profiler
+        if engine!="numpy": fruit_pool.reserve(16); bomb_pool.reserve(8)
+        explosion_pool.reserve(2)
+        self.player=Player(self.sim.player)
         self.all_sprites=pygame.sprite.Group(self.player)
         self.fruits=pygame.sprite.Group(); self.bombs=pygame.sprite.Group(); self.expl=pygame.sprite.Group()
-        self.score=0; self.spawn_timer=0.0; self.game_over=False; self.pause=False
-        self.bonus=False; self.bonus_timer=0.0
+        self.pause=False
+        self.score_text=HudText(24,UI_TEXT,topleft=(12,8))
+        self.diff_text=HudText(24,UI_TEXT,topleft=(12,34))
+        self.lives_text=HudText(24,UI_TEXT,topleft=(WIN_W-120,8))
+        self.bonus_text=HudText(24,(200,30,30),midtop=(WIN_W//2,8))
+        self.hud=[self.score_text,self.diff_text,self.lives_text,self.bonus_text]
+        self.refresh_hud()
         self.cloud_wind = 0.6 + (0.4 if diff=="Easy" else (0.9 if diff=="Medium" else 1.2))
-    def update(self,dt):
+    # read-only views of sim state used by the HUD and main loop
+    score = property(lambda self: self.sim.score)
+    lives = property(lambda self: self.sim.lives)
+    bonus = property(lambda self: self.sim.bonus)
+    bonus_timer = property(lambda self: self.sim.bonus_timer)
+    game_over = property(lambda self: self.sim.game_over)
+    def update(self,dt,move=IDLE):
         if self.pause:
             self.expl.update(dt); return
         if self.game_over:
             self.expl.update(dt); return
-        interval = max(0.3, self.spawn_interval - min(0.4, self.score/600.0))
-        if self.bonus: interval = max(0.18, interval*0.6)
-        self.spawn_timer += dt
-        if self.spawn_timer >= interval:
-            self.spawn_timer = 0.0
-            if (not self.bonus) and random.random() > 0.75:
-                b=Bomb(speed_mult=self.bomb_mult); self.bombs.add(b); self.all_sprites.add(b)
-            else:
-                f=Fruit(speed_mult=self.fruit_mult); self.fruits.add(f); self.all_sprites.add(f)
-        for c in clouds: c.update(dt, wind=self.cloud_wind)
-        self.player.update(dt)
-        for s in list(self.fruits)+list(self.bombs)+list(self.expl):
-            s.update(dt)
-        hits = pygame.sprite.spritecollide(self.player, self.fruits, dokill=True)
-        if hits:
-            self.score += 10*len(hits); play_sound(catch_sound)
-            if (self.score // 100) > ((self.score - 10*len(hits))//100):
-                self.bonus = True; self.bonus_timer = BONUS_DURATION
-        bomb_hit = pygame.sprite.spritecollideany(self.player, self.bombs)
-        if bomb_hit:
-            expl = Explosion(self.player.rect.center); self.expl.add(expl); self.all_sprites.add(expl)
-            for b in list(self.bombs): b.kill()
-            self.lives -= 1; play_sound(explosion_sound)
-            if self.lives <= 0:
-                self.game_over = True; play_sound(gameover_sound); add_highscore(self.name,self.score,self.diff)
+        events = self.advance(dt, move)
+        for ev,data in events:
+            if ev=="spawn":
+                if self.engine=="numpy": continue
+                if data.kind=="bomb": s=bomb_pool.acquire().bind(data); self.bombs.add(s)
+                else: s=fruit_pool.acquire().bind(data); self.fruits.add(s)
+                self.all_sprites.add(s)
+            elif ev=="catch": play_sound("catch")
+            elif ev=="bomb":
+                self.explode(data); play_sound("explosion")
+            elif ev=="gameover":
+                play_sound("gameover")
+                profiler.mark("events")
+                self.finish()
+                profiler.mark("highscore")
+        profiler.mark("events")
+        self.player.update(dt, self.alpha)
+        for s in list(self.fruits)+list(self.bombs): s.update(dt, self.alpha)
         self.expl.update(dt)
-        if self.bonus:
-            self.bonus_timer -= dt
-            if self.bonus_timer <= 0: self.bonus=False; self.bonus_timer=0.0
+        profiler.mark("sprites")
+        self.refresh_hud()
+    def advance(self, dt, move):
+        # runs the fixed-step sim for this frame's time; returns its events
+        self.acc = min(self.acc + dt, 8*STEP)    # drop time rather than spiral on long stalls
+        events = []
+        while self.acc >= STEP and not self.sim.game_over:
+            self.acc -= STEP; self.tick += 1
+            self.recorder.record(move)
+            step = self.sim.step(STEP, move)
+            if self.log and step: self.log.record(self.tick, step, self.score, self.lives)
+            events += step
+        self.alpha = self.acc / STEP
+        return events
+    def finish(self):
+        add_highscore(self.name,self.score,self.diff)
+        if self.on_game_over: self.on_game_over(self)
+    def rescale(self):
+        # sprites and HUD pick up a new render scale when they next update, which a paused
+        # or finished game doesn't do
+        self.player.update(0.0, self.alpha)
+        for s in list(self.fruits)+list(self.bombs): s.update(0.0, self.alpha)
+        self.refresh_hud()
+    def recycle(self):
+        # hand live pooled sprites back before this game is dropped (restart, bench)
+        for s in list(self.fruits)+list(self.bombs)+list(self.expl): s.recycle()
+    def explode(self, pos):
+        expl = explosion_pool.acquire().start(pos); self.expl.add(expl); self.all_sprites.add(expl)
+    def draw_drops(self, surf):
+        d=self.sim.drops; images=[atlas.get(k) for k in self.kinds]; s=view.scale
+        x=d.view("x"); y=lerp(d.view("prev_y"), d.view("y"), self.alpha); kind=d.view("kind")
+        vis=(y.round() > -d.view("size")).nonzero()[0]
+        x=(x*s).round().astype(x.dtype); y=(y*s).round()
+        surf.blits([(images[k],(px,py)) for k,px,py in zip(kind[vis].tolist(),x[vis].tolist(),y[vis].tolist())], doreturn=False)
+    def refresh_hud(self):
+        self.score_text.set(f"{self.name}  Score: {self.score}")
+        self.diff_text.set(f"Difficulty: {self.diff}")
+        self.lives_text.set(f"Lives: {self.lives}")
+        self.bonus_text.set(f"BONUS! {int(self.bonus_timer)}s", self.bonus)
     def draw(self,surf):
-        surf.fill((180,220,255))
-        for c in clouds: c.draw(surf)
-        pygame.draw.rect(surf,(72,170,90),(0,WIN_H-36,WIN_W,36))
+        draw_background(surf,GAME_SKY,GROUND)
+        if self.engine=="numpy": self.draw_drops(surf)
         self.all_sprites.draw(surf)
-        surf.blit(font.render(f"{self.name}  Score: {self.score}", True, UI_TEXT),(12,8))
-        surf.blit(font.render(f"Difficulty: {self.diff}", True, UI_TEXT),(12,34))
-        surf.blit(font.render(f"Lives: {self.lives}", True, UI_TEXT),(WIN_W-120,8))
-        if self.bonus:
-            txt = font.render(f"BONUS! {int(self.bonus_timer)}s",True,(200,30,30))
-            surf.blit(txt,(WIN_W//2 - txt.get_width()//2,8))
+        for h in self.hud:
+            if h.visible: surf.blit(h.image,h.rect)
+        # overlays are laid out in logical coordinates like everything else
+        small, big, at = view.font(24), view.font(44), view.pos
         if self.pause:
-            draw_panel(surf,(WIN_W//2-200,WIN_H//2-80,400,120))
-            surf.blit(big_font.render("PAUSED",True,(60,60,60)),(WIN_W//2-80,WIN_H//2-50))
-            surf.blit(font.render("Press P to resume",True,(60,60,60)),(WIN_W//2-80,WIN_H//2+5))
+            draw_panel(surf,view.rect((WIN_W//2-200,WIN_H//2-80,400,120)))
+            surf.blit(render_text(big, "PAUSED", (60,60,60)),at(WIN_W//2-80,WIN_H//2-50))
+            surf.blit(render_text(small, "Press P to resume", (60,60,60)),at(WIN_W//2-80,WIN_H//2+5))
         if self.game_over:
-            draw_panel(surf,(WIN_W//2-260,WIN_H//2-120,520,220))
-            surf.blit(big_font.render("GAME OVER",True,(200,40,40)),(WIN_W//2-150,WIN_H//2-80))
-            surf.blit(font.render(f"Final Score: {self.score}",True,(40,40,40)),(WIN_W//2-60,WIN_H//2-20))
-            surf.blit(font.render("Press R to Restart or ESC to Quit",True,(40,40,40)),(WIN_W//2-160,WIN_H//2+30))
+            draw_panel(surf,view.rect((WIN_W//2-260,WIN_H//2-120,520,220)))
+            surf.blit(render_text(big, "GAME OVER", (200,40,40)),at(WIN_W//2-150,WIN_H//2-80))
+            surf.blit(render_text(small, f"Final Score: {self.score}", (40,40,40)),at(WIN_W//2-60,WIN_H//2-20))
+            surf.blit(render_text(small, "Press R to Restart or ESC to Quit", (40,40,40)),at(WIN_W//2-160,WIN_H//2+30))
+
+# ---------- Network play ----------
+# fruit.py --connect HOST:PORT: server.py runs the game, this process only draws it
+class NetClient:
+    # non-blocking socket polled once per frame
+    def __init__(self, addr):
+        host, _, port = addr.rpartition(":")
+        self.sock = socket.create_connection((host or "127.0.0.1", int(port)), timeout=5)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1); self.sock.setblocking(False)
+        self.frames = net.FrameReader(); self.closed = False; self.out = bytearray()
+    def send(self, data):
+        self.out += data; self.drain()
+    def drain(self):
+        # whatever the socket won't take right now stays queued for the next poll()
+        while self.out and not self.closed:
+            try: n = self.sock.send(self.out)
+            except BlockingIOError: break
+            except OSError: self.closed = True; break
+            del self.out[:n]
+    def poll(self):
+        self.drain()
+        chunks = []
+        while not self.closed:
+            try: data = self.sock.recv(65536)
+            except BlockingIOError: break
+            except OSError: data = b""
+            if not data: self.closed = True
+            chunks.append(data)
+        return self.frames.feed(b"".join(chunks))
+
+class NetGame(Game):
+    # snapshots are turned back into the events SimGame.step would return, so sprites,
+    # sounds and the HUD work unchanged; the server keeps its own leaderboard
+    pause = property(lambda self: False, lambda self, v: None)     # the server keeps ticking
+    def __init__(self, name, diff, client):
+        self.client=client; self.started=False; self.seq=0; self.sent_move=None
+        super().__init__(name, diff, sim=net.ClientState(diff))
+        client.send(net.hello(name, diff))
+    def advance(self, dt, move):
+        if self.started and move != self.sent_move:
+            self.seq += 1; self.sent_move = move
+            self.client.send(net.input_msg(self.seq, move))
+        events = []
+        for msg in self.client.poll():
+            if msg[0]==net.WELCOME:
+                _, sid, diff, seed = net.WELCOME_MSG.unpack(msg)
+                self.sim.reset(sid, net.DIFFS[diff], seed); self.seed=seed
+                self.player.body=self.sim.player; self.started=True
+            elif msg[0]==net.SNAPSHOT and self.started:
+                self.tick += 1
+                step = self.sim.apply(msg)
+                if self.log and step: self.log.record(self.tick, step, self.score, self.lives)
+                events += step
+        if self.client.closed and not self.sim.game_over:
+            self.sim.game_over=True; over=[("gameover", self.score)]
+            if self.log: self.log.record(self.tick, over, self.score, self.lives)
+            events += over
+        self.alpha = 1.0
+        return events
+    def finish(self):
+        if self.on_game_over: self.on_game_over(self)
+
+# ---------- Dirty-rect renderer ----------
+# optional presenter: LayeredDirty restores and pushes only the regions that changed,
+# falling back to a full draw + flip while the pause/game-over overlays are up
+# (and for the numpy engine, whose drops are not sprites)
+class DirtyRenderer:
+    def __init__(self):
+        self.game=None; self.group=None; self.full=True; self.version=None
+    def bind(self, game):
+        self.game=game; self.full=True; self.version=view.version
+        self.group=pygame.sprite.LayeredDirty()
+        self.group.add(*clouds, layer=0)
+        self.group.add(*game.hud, layer=2)
+    def draw(self, game, surf):
+        # returns the changed rects, or None when the whole frame was redrawn
+        if game is not self.game or view.version != self.version: self.bind(game)
+        if game.pause or game.game_over or game.engine=="numpy":
+            game.draw(surf); self.full=True; return None
+        for s in game.all_sprites:
+            if s not in self.group: self.group.add(s, layer=1)
+        self.group.clear(surf, backgrounds.get(GAME_SKY,GROUND))
+        if self.full:
+            self.group.repaint_rect(surf.get_rect()); self.full=False
+        return self.group.draw(surf)
+    def flip(self, rects):
+        # a scaled canvas is presented whole (the scaling pass touches every pixel anyway)
+        view.flip(rects)
+
+# ---------- Adaptive render scale ----------
+# --adaptive: drops the render scale a step while smoothed frame work stays over budget and
+# steps back up (to the --render-scale ceiling) once the larger canvas should fit comfortably.
+# Each step down is a trial: if the smaller canvas doesn't cost less (a smoothscale upscale can
+# cost more than the drawing it saves), it goes back up and stops lowering below that scale.
+class AdaptiveScale:
+    def __init__(self, ceiling, budget=1.0/FPS):
+        self.ceiling=ceiling; self.budget=budget
+        self.floor=SCALE_MIN; self.trial=None     # trial: (scale, avg work) from before the last step down
+        self.reset()
+    def reset(self):
+        self.avg=None; self.over=0; self.under=0; self.frames=0; self.total=0.0
+    def update(self, work):
+        # returns True when it changed the scale
+        self.avg = work if self.avg is None else self.avg + (work - self.avg)*0.1
+        self.frames += 1
+        if self.frames > 5: self.total += work      # skip the frames that rebuild sprites at the new scale
+        if self.trial and self.frames == 35:
+            scale, before = self.trial; self.trial = None
+            if self.total/30 >= before:
+                self.floor = scale; return self.set(scale)
+        up = (view.scale + SCALE_STEP) / view.scale
+        # only step up when even a proportionally slower frame stays well inside the budget
+        self.over = self.over+1 if self.avg > self.budget*0.9 else 0
+        self.under = self.under+1 if self.avg*up < self.budget*0.7 else 0
+        if self.over >= 30 and not self.trial and view.scale > self.floor:
+            self.trial = (view.scale, self.avg); scale = view.scale - SCALE_STEP
+        elif self.under >= 300 and view.scale < self.ceiling: scale = min(self.ceiling, view.scale + SCALE_STEP)
+        else: return False
+        return self.set(scale)
+    def set(self, scale):
+        view.set_scale(scale); self.reset()
+        return True
+
+# ---------- Profiler overlay ----------
+# F3 toggles it; text lines are rebuilt 4x a second, the frame-time graph every frame
+profiler = Profiler()
+
+class ProfilerOverlay:
+    GRAPH_H = 70; GRAPH_MS = 50.0
+    def __init__(self, prof):
+        self.prof=prof; self.visible=False
+        self.rect=pygame.Rect(WIN_W-306, 60, 296, 400)
+        self.small=pygame.font.SysFont(None, 18)
+        self.lines=[]; self.refreshed=0.0
+    def build_lines(self):
+        p=self.prof; lines=[]
+        iv=sum(p.interval)/len(p.interval)*1000.0 if p.interval else 0.0
+        wk=sum(p.work)/len(p.work)*1000.0 if p.work else 0.0
+        lines.append((f"frame {iv:5.1f}ms  {1000.0/iv if iv else 0:4.0f} fps", f"work {wk:5.2f}ms"))
+        lines.append(("phase", "avg / max ms"))
+        for ph in p.phases:
+            mean,peak=p.stats(ph)
+            lines.append((ph, f"{mean:6.2f} / {peak:6.2f}"))
+        counts=[f"{k} {v}" for k,v in p.counts.items()]
+        for i in range(0, len(counts), 3): lines.append(("  ".join(counts[i:i+3]), ""))
+        lines.append(("pools live/free/alloc", "  ".join(f"{n[0]} {st['live']}/{st['free']}/{st['allocated']}"
+                                                        for n,st in ((n,pl.stats()) for n,pl in POOLS.items()))))
+        tc=text_cache.stats()
+        lines.append((f"text cache {tc['hits']} hit / {tc['misses']} miss", f"scale {view.scale:g}x"))
+        c=lambda t: self.small.render(t, True, UI_TEXT)
+        self.lines=[(c(a), c(b)) for a,b in lines]
+    def draw(self, surf):
+        # drawn on the window after the canvas is presented, so it stays readable at any scale
+        now=time.perf_counter()
+        if now - self.refreshed > 0.25: self.refreshed=now; self.build_lines()
+        r=self.rect; r.right=surf.get_width()-10; draw_panel(surf,r)
+        y=r.y+8
+        for left,right in self.lines:
+            surf.blit(left,(r.x+10,y)); surf.blit(right,(r.right-10-right.get_width(),y)); y+=17
+        # frame-time graph: grey = interval between frames, red = work; green line = frame budget
+        gx, gy, gw, gh = r.x+10, r.bottom-10-self.GRAPH_H, r.width-20, self.GRAPH_H
+        pygame.draw.rect(surf,(235,235,240),(gx,gy,gw,gh))
+        to_y = lambda sec: gy + gh - min(gh, int(sec*1000.0/self.GRAPH_MS*gh))
+        pygame.draw.line(surf,(60,170,90),(gx,to_y(1.0/FPS)),(gx+gw,to_y(1.0/FPS)))
+        for series,color in ((self.prof.interval,(140,140,150)),(self.prof.work,(210,50,50))):
+            pts=[(gx+i, to_y(v)) for i,v in enumerate(list(series)[-gw:])]
+            if len(pts) > 1: pygame.draw.lines(surf,color,False,pts)
 
 # ---------- Pages ----------
-def instructions_page():
-    waiting=True
-    while waiting:
-        dt=clock.tick(FPS)/1000.0; mx,my=pygame.mouse.get_pos()
-        for ev in pygame.event.get():
-            if ev.type==pygame.QUIT: pygame.quit(); sys.exit()
-            if ev.type==pygame.KEYDOWN and ev.key==pygame.K_ESCAPE: waiting=False
-            if ev.type==pygame.MOUSEBUTTONDOWN and 320<mx<500 and 680<my<740: waiting=False
-        screen.fill((250,250,255)); draw_panel(screen,(60,40,WIN_W-120,WIN_H-120))
-        screen.blit(big_font.render("How To Play",True,(30,30,30)),(120,80))
-        lines=["Catch fruits to score (+10 each).","Avoid bombs - collision causes explosion and lose a life.",
-               "Every 100 points starts a BONUS ROUND (fruits only).","Difficulty affects spawn and speed.",
-               "Use Left/Right or A/D to move.","Press P to pause/resume.","High scores saved locally (top 5).",
-               "Press ESC or Back to return."]
-        for i,ln in enumerate(lines): screen.blit(font.render(ln,True,(40,40,40)),(120,150+i*30))
-        # sample visuals
-        sf = pygame.Surface((60,60), pygame.SRCALPHA); draw_apple(sf,(200,40,40)); screen.blit(sf,(WIN_W-220,170))
-        screen.blit(font.render("Sample Fruit",True,(30,30,30)),(WIN_W-320,230))
-        sb = pygame.Surface((60,60), pygame.SRCALPHA); pygame.draw.circle(sb,(40,40,40),(30,30),22); screen.blit(sb,(WIN_W-220,260))
-        screen.blit(font.render("Bomb",True,(30,30,30)),(WIN_W-320,320))
-        draw_button(screen,(320,680,180,60),"Back",(mx,my)); pygame.display.flip()
+# each page is a draw function (also used by bench.py) plus a loop that feeds it input
+BACK_BTN = (320,680,180,60)
+HOW_TO_LINES = ["Catch fruits to score (+10 each).","Avoid bombs - collision causes explosion and lose a life.",
+                "Every 100 points starts a BONUS ROUND (fruits only).","Difficulty affects spawn and speed.",
+                "Use Left/Right or A/D to move.","Press P to pause/resume.","High scores saved locally (top 5 shown).",
+                "Press ESC or Back to return."]
 
-def show_highscores():
-    waiting=True
-    while waiting:
-        dt=clock.tick(FPS)/1000.0; mx,my=pygame.mouse.get_pos()
-        for ev in pygame.event.get():
-            if ev.type==pygame.QUIT: pygame.quit(); sys.exit()
-            if ev.type==pygame.MOUSEBUTTONDOWN and 320<mx<500 and 680<my<740: waiting=False
-        screen.fill((245,245,250)); draw_panel(screen,(60,40,WIN_W-120,WIN_H-120))
-        screen.blit(big_font.render("High Scores",True,(30,30,30)),(120,80))
-        scores=load_highscores()
-        if not scores: screen.blit(font.render("No high scores yet. Play to set a record!",True,(40,40,40)),(120,150))
-        else:
-            for i,e in enumerate(scores): screen.blit(font.render(f"{i+1}. {e['name']} - {e['score']} ({e['difficulty']}) on {e['time']}",True,(30,30,30)),(120,150+i*40))
-        draw_button(screen,(320,680,180,60),"Back",(mx,my)); pygame.display.flip()
+def draw_instructions(surf, mouse):
+    draw_background(surf,(250,250,255),with_clouds=False); draw_panel(surf,(60,40,WIN_W-120,WIN_H-120))
+    surf.blit(render_text(big_font, "How To Play", (30,30,30)),(120,80))
+    for i,ln in enumerate(HOW_TO_LINES): surf.blit(render_text(font, ln, (40,40,40)),(120,150+i*30))
+    # sample visuals
+    surf.blit(atlas.get("Apple"),(WIN_W-220,170))
+    surf.blit(render_text(font, "Sample Fruit", (30,30,30)),(WIN_W-320,230))
+    pygame.draw.circle(surf,(40,40,40),(WIN_W-190,290),22)
+    surf.blit(render_text(font, "Bomb", (30,30,30)),(WIN_W-320,320))
+    draw_button(surf,BACK_BTN,"Back",mouse)
 
-def start_page():
-    nickname=""; cursor_vis=True; cursor_t=0.0; difficulty="Medium"
-    # layout math: centered panel
-    panel_w = 680; panel_h = 480
-    panel_x = (WIN_W - panel_w)//2; panel_y = 120
-    # left col (difficulty) inside panel
-    left_w = 240; left_x = panel_x + 28; left_y = panel_y + 36
-    # right col (controls) inside panel
-    right_x = left_x + left_w + 32; right_w = panel_w - (left_w + 32) - 56
-    # nickname box inside right col (centered horizontally in right col)
-    input_w, input_h = 360, 46
-    input_x = right_x + (right_w - input_w)//2
-    input_y = panel_y + 48
-    # buttons: arranged vertically in right col
-    btn_w, btn_h = 200, 60
-    btn_x = right_x + (right_w - btn_w)//2
-    start_btn_y = input_y + 120; how_btn_y = start_btn_y + btn_h + 18; high_btn_y = how_btn_y + btn_h + 18
+def draw_highscores(surf, mouse):
+    draw_background(surf,(245,245,250),with_clouds=False); draw_panel(surf,(60,40,WIN_W-120,WIN_H-120))
+    surf.blit(render_text(big_font, "High Scores", (30,30,30)),(120,80))
+    scores=leaderboard.top(5)
+    if not scores: surf.blit(render_text(font, "No high scores yet. Play to set a record!", (40,40,40)),(120,150))
+    else:
+        for i,e in enumerate(scores): surf.blit(render_text(font, f"{i+1}. {e['name']} - {e['score']} ({e['difficulty']}) on {e['time']}", (30,30,30)),(120,150+i*40))
+    draw_button(surf,BACK_BTN,"Back",mouse)
+
+def over_back(mouse):
+    x,y,w,h = BACK_BTN
+    return x < mouse[0] < x+w and y < mouse[1] < y+h
+
+# ---------- Idle menu loop ----------
+# menus block in pygame.event.wait until input arrives or the page's next timed change
+# (cursor blink) is due. A page describes what it shows as {rect: state}; only rects whose
+# state changed are redrawn (clipped) and pushed to the display.
+# Menus are idle most of the time, so they always lay out at 1x and are only scaled to fit
+# the window; the render scale applies to gameplay (see main).
+def menu_loop(page):
+    view.set_scale(1.0)
+    shown = None; last = time.perf_counter()
     while True:
-        dt = clock.tick(FPS)/1000.0; mx,my = pygame.mouse.get_pos()
-        for ev in pygame.event.get():
+        timeout = page.next_change()
+        events = [pygame.event.wait() if timeout is None else pygame.event.wait(max(1, int(timeout*1000)))]
+        events += pygame.event.get()
+        now = time.perf_counter(); dt = now - last; last = now
+        mouse = view.mouse()
+        for ev in events:
             if ev.type==pygame.QUIT: pygame.quit(); sys.exit()
-            if ev.type==pygame.KEYDOWN:
-                if ev.key==pygame.K_RETURN and nickname.strip()!="": return nickname,difficulty
-                if ev.key==pygame.K_BACKSPACE: nickname=nickname[:-1]
-                elif ev.unicode and len(nickname) < 18 and ev.unicode.isprintable(): nickname += ev.unicode
-            if ev.type==pygame.MOUSEBUTTONDOWN:
-                # main buttons
-                if btn_x < mx < btn_x+btn_w and start_btn_y < my < start_btn_y+btn_h and nickname.strip()!="":
-                    return nickname,difficulty
-                if btn_x < mx < btn_x+btn_w and how_btn_y < my < how_btn_y+btn_h:
-                    instructions_page()
-                if btn_x < mx < btn_x+btn_w and high_btn_y < my < high_btn_y+btn_h:
-                    show_highscores()
-                # difficulty buttons
-                if left_x < mx < left_x + left_w and left_y + 56 < my < left_y + 56 + 48:
-                    difficulty = "Easy"
-                if left_x < mx < left_x + left_w and left_y + 56 + 64 < my < left_y + 56 + 64 + 48:
-                    difficulty = "Medium"
-                if left_x < mx < left_x + left_w and left_y + 56 + 128 < my < left_y + 56 + 128 + 48:
-                    difficulty = "Hard"
-        cursor_t += dt
-        if cursor_t >= 0.5: cursor_t = 0.0; cursor_vis = not cursor_vis
+            if ev.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED): shown = None
+            result = page.handle(ev, mouse)
+            if result:
+                clock.tick()    # the game loop's first dt shouldn't include menu time
+                return result
+        page.tick(dt)
+        mouse = view.mouse()      # may have moved while a nested page was open
+        state = page.view(mouse); canvas = view.canvas
+        if shown is None or page.full:
+            page.full = False; page.draw(canvas, mouse); view.present(); view.flip()
+        else:
+            rects = [pygame.Rect(r) for r,v in state.items() if shown.get(r, not v) != v]
+            rects += [pygame.Rect(r) for r in shown if r not in state]
+            if rects:
+                canvas.set_clip(rects[0].unionall(rects[1:]))
+                page.draw(canvas, mouse); canvas.set_clip(None)
+                view.present(); view.flip(rects)
+        shown = state
+
+class BackPage:
+    # instructions / highscores: static apart from the Back button's hover
+    full = False
+    def __init__(self, draw, esc_closes=True):
+        self.draw = draw; self.esc_closes = esc_closes
+    def handle(self, ev, mouse):
+        if self.esc_closes and ev.type==pygame.KEYDOWN and ev.key==pygame.K_ESCAPE: return True
+        if ev.type==pygame.MOUSEBUTTONDOWN and over_back(mouse): return True
+        return None
+    def tick(self, dt): pass
+    def next_change(self): return None
+    def view(self, mouse):
+        return {BACK_BTN: over_back(mouse)}
+
+def instructions_page():
+    menu_loop(BackPage(draw_instructions))
+
+def show_highscores():
+    menu_loop(BackPage(draw_highscores, esc_closes=False))
+
+class StartPage:
+    def __init__(self):
+        self.nickname=""; self.cursor_vis=True; self.cursor_t=0.0; self.difficulty="Medium"
+        self.blink=True; self.full=False
+        # layout math: centered panel
+        self.panel_w = 680; self.panel_h = 480
+        self.panel_x = (WIN_W - self.panel_w)//2; self.panel_y = 120
+        # left col (difficulty) inside panel
+        self.left_w = 240; self.left_x = self.panel_x + 28; self.left_y = self.panel_y + 36
+        # right col (controls) inside panel
+        right_x = self.left_x + self.left_w + 32; right_w = self.panel_w - (self.left_w + 32) - 56
+        # nickname box inside right col (centered horizontally in right col)
+        self.input_w, self.input_h = 360, 46
+        self.input_x = right_x + (right_w - self.input_w)//2
+        self.input_y = self.panel_y + 48
+        # buttons: arranged vertically in right col
+        self.btn_w, self.btn_h = 200, 60
+        self.btn_x = right_x + (right_w - self.btn_w)//2
+        self.start_btn_y = self.input_y + 120
+        self.how_btn_y = self.start_btn_y + self.btn_h + 18; self.high_btn_y = self.how_btn_y + self.btn_h + 18
+        # difficulty buttons (stacked with even spacing)
+        self.d_w = self.left_w - 24; self.d_h = 48; self.d_x = self.left_x + 12
+        self.d_y = {"Easy":self.left_y + 56}
+        self.d_y["Medium"] = self.d_y["Easy"] + self.d_h + 16; self.d_y["Hard"] = self.d_y["Medium"] + self.d_h + 16
+    def button_at(self, mx, my):
+        if self.btn_x < mx < self.btn_x+self.btn_w:
+            for name,y in (("start",self.start_btn_y),("how",self.how_btn_y),("high",self.high_btn_y)):
+                if y < my < y+self.btn_h: return name
+        if self.left_x < mx < self.left_x + self.left_w:
+            for i,diff in enumerate(("Easy","Medium","Hard")):
+                if self.left_y + 56 + 64*i < my < self.left_y + 56 + 64*i + 48: return diff
+        return None
+    def handle(self, ev, mouse):
+        # returns (nickname, difficulty) once the player starts a game
+        if ev.type==pygame.KEYDOWN:
+            if ev.key==pygame.K_RETURN and self.nickname.strip()!="": return self.nickname,self.difficulty
+            if ev.key==pygame.K_BACKSPACE: self.nickname=self.nickname[:-1]
+            elif ev.unicode and len(self.nickname) < 18 and ev.unicode.isprintable(): self.nickname += ev.unicode
+        if ev.type==pygame.MOUSEBUTTONDOWN:
+            hit = self.button_at(*mouse)
+            if hit=="start" and self.nickname.strip()!="": return self.nickname,self.difficulty
+            if hit=="how": instructions_page(); self.full=True
+            if hit=="high": show_highscores(); self.full=True
+            if hit in DIFFS: self.difficulty = hit
+        return None
+    def tick(self, dt):
+        self.cursor_t += dt
+        if self.cursor_t >= 0.5: self.cursor_t = 0.0; self.cursor_vis = not self.cursor_vis
+        self.blink = (pygame.time.get_ticks()//250)%2==0
+    def next_change(self):
+        # seconds until the cursor can next appear or disappear
+        return min(0.5 - self.cursor_t, (250 - pygame.time.get_ticks()%250)/1000.0)
+    def view(self, mouse):
+        mx, my = mouse
+        over = lambda r: r[0] < mx < r[0]+r[2] and r[1] < my < r[1]+r[3]
+        buttons = [(self.d_x,y,self.d_w,self.d_h) for y in self.d_y.values()]
+        buttons += [(self.btn_x,y,self.btn_w,self.btn_h) for y in (self.start_btn_y,self.how_btn_y,self.high_btn_y)]
+        labels = {b: over(b) for b in buttons}
+        # the difficulty column incl. its tick box and "Selected:" line; the nickname box
+        labels[(self.left_x-8, self.left_y-8, self.left_w+32, 290)] = self.difficulty
+        labels[(self.input_x, self.input_y, self.input_w, self.input_h)] = (self.nickname, self.cursor_vis and self.blink)
+        for c in clouds: labels[tuple(c.rect)] = True
+        return labels
+    def draw(self, surf, mouse):
+        panel_x, panel_y, left_x, left_y = self.panel_x, self.panel_y, self.left_x, self.left_y
+        input_x, input_y, input_w, input_h = self.input_x, self.input_y, self.input_w, self.input_h
         # draw background & clouds
-        screen.fill((200,230,255))
-        for c in clouds: c.draw(screen)
+        draw_background(surf,(200,230,255))
         # central panel
-        draw_panel(screen,(panel_x,panel_y,panel_w,panel_h))
+        draw_panel(surf,(panel_x,panel_y,self.panel_w,self.panel_h))
         # title (centered over panel)
-        title_s = title_font.render("Bomb & Berry", True, (200,40,60))
-        
-   
-        screen.blit(title_s, ((WIN_W - title_s.get_width())//2, panel_y - 80))
+        title_s = render_text(title_font, "Bomb & Berry", (200,40,60))
+        surf.blit(title_s, ((WIN_W - title_s.get_width())//2, panel_y - 80))
         # left difficulty column
-        draw_panel(screen,(left_x - 8, left_y - 8, left_w + 16, 260))
-        screen.blit(font.render("Difficulty", True, UI_TEXT),(left_x + 12, left_y))
-        # difficulty buttons (stacked with even spacing)
-        d_w = left_w - 24; d_h = 48; d_x = left_x + 12
-        d1_y = left_y + 56; d2_y = d1_y + d_h + 16; d3_y = d2_y + d_h + 16
-        draw_button(screen,(d_x,d1_y,d_w,d_h),"Easy",(mx,my))
-        draw_button(screen,(d_x,d2_y,d_w,d_h),"Medium",(mx,my))
-        draw_button(screen,(d_x,d3_y,d_w,d_h),"Hard",(mx,my))
+        draw_panel(surf,(left_x - 8, left_y - 8, self.left_w + 16, 260))
+        surf.blit(render_text(font, "Difficulty", UI_TEXT),(left_x + 12, left_y))
+        for diff,y in self.d_y.items(): draw_button(surf,(self.d_x,y,self.d_w,self.d_h),diff,mouse)
         # mark selected difficulty with a small tick box
-        tick_x = d_x + d_w + 12
-        sel_map = {"Easy":d1_y,"Medium":d2_y,"Hard":d3_y}
-        pygame.draw.rect(screen,(245,245,210),(tick_x, sel_map[difficulty], 18, d_h), border_radius=4)
-        screen.blit(font.render(f"Selected: {difficulty}", True, UI_TEXT),(left_x + 12, d3_y + d_h + 20))
+        tick_x = self.d_x + self.d_w + 12
+        pygame.draw.rect(surf,(245,245,210),(tick_x, self.d_y[self.difficulty], 18, self.d_h), border_radius=4)
+        surf.blit(render_text(font, f"Selected: {self.difficulty}", UI_TEXT),(left_x + 12, self.d_y["Hard"] + self.d_h + 20))
         # right column: nickname textbox
-        screen.blit(font.render("Enter your nickname:", True, UI_TEXT),(input_x, input_y - 28))
-        pygame.draw.rect(screen,TEXTBOX_COLOR,(input_x,input_y,input_w,input_h), border_radius=8)
-        name_surf = font.render(nickname, True, (20,20,20))
-        screen.blit(name_surf,(input_x + 12, input_y + 12))
-        if cursor_vis and (pygame.time.get_ticks()//250)%2==0:
+        surf.blit(render_text(font, "Enter your nickname:", UI_TEXT),(input_x, input_y - 28))
+        pygame.draw.rect(surf,TEXTBOX_COLOR,(input_x,input_y,input_w,input_h), border_radius=8)
+        name_surf = render_text(font, self.nickname, (20,20,20))
+        surf.blit(name_surf,(input_x + 12, input_y + 12))
+        if self.cursor_vis and self.blink:
             cx = input_x + 12 + name_surf.get_width()
-            pygame.draw.line(screen, CURSOR_COLOR, (cx, input_y+12), (cx, input_y+input_h-12), 2)
+            pygame.draw.line(surf, CURSOR_COLOR, (cx, input_y+12), (cx, input_y+input_h-12), 2)
         # right column buttons
-        draw_button(screen,(btn_x,start_btn_y,btn_w,btn_h),"Start Game",(mx,my))
-        draw_button(screen,(btn_x,how_btn_y,btn_w,btn_h),"How To Play",(mx,my))
-        draw_button(screen,(btn_x,high_btn_y,btn_w,btn_h),"High Scores",(mx,my))
+        draw_button(surf,(self.btn_x,self.start_btn_y,self.btn_w,self.btn_h),"Start Game",mouse)
+        draw_button(surf,(self.btn_x,self.how_btn_y,self.btn_w,self.btn_h),"How To Play",mouse)
+        draw_button(surf,(self.btn_x,self.high_btn_y,self.btn_w,self.btn_h),"High Scores",mouse)
         # footer tip centered under panel
         tip = "Tip: Use Left/Right arrows or A/D to move. Press P to pause."
-        screen.blit(font.render(tip, True, UI_TEXT), ((WIN_W - font.size(tip)[0])//2, panel_y + panel_h + 12))
-        pygame.display.flip()
+        surf.blit(render_text(font, tip, UI_TEXT), ((WIN_W - font.size(tip)[0])//2, panel_y + self.panel_h + 12))
+
+def start_page():
+    return menu_loop(StartPage())
 
 # ---------- Main ----------
+def read_move():
+    keys=pygame.key.get_pressed()
+    move=IDLE
+    if keys[pygame.K_LEFT] or keys[pygame.K_a]: move=LEFT
+    if keys[pygame.K_RIGHT] or keys[pygame.K_d]: move=RIGHT
+    return move
+
+def save_replay(game, folder):
+    # written off the render thread; replays are only useful with the plain sim (no stress rain)
+    if game.sim.stress: return
+    path = os.path.join(folder, f"{time.strftime('%Y%m%d-%H%M%S')}-{game.diff}-{game.score}.bbr")
+    threading.Thread(target=game.recorder.save, args=(path, game.score)).start()
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Bomb & Berry")
+    ap.add_argument("--dirty", action="store_true", help="dirty-rectangle rendering (update only changed regions)")
+    ap.add_argument("--engine", choices=["sprites","numpy"], default="sprites", help="falling-object engine")
+    ap.add_argument("--stress", type=int, default=0, metavar="N", help="keep N extra fruits falling (numpy engine)")
+    ap.add_argument("--replays", metavar="DIR", help="save each finished game's input log here (check with replay.py)")
+    ap.add_argument("--profile", action="store_true", help="start with the profiler overlay shown (F3 toggles)")
+    ap.add_argument("--telemetry", metavar="CSV", help="write per-frame phase timings to this file")
+    ap.add_argument("--connect", metavar="HOST:PORT", help="play on a server.py instance instead of locally")
+    ap.add_argument("--eventlog", metavar="DIR", help="write a binary event log per game here (analyze with eventlog.py)")
+    ap.add_argument("--window-scale", type=float, default=1.0, metavar="W", help="window size as a multiple of 820x820")
+    ap.add_argument("--render-scale", type=float, metavar="S",
+                    help=f"gameplay resolution as a multiple of 820x820, {SCALE_MIN:g}-{SCALE_MAX:g} (default: the window scale)")
+    ap.add_argument("--adaptive", action="store_true", help="lower the render scale while frames run over budget")
+    ap.add_argument("--scale-filter", choices=["smooth","fast"], default="smooth", help="filter used to fit the canvas to the window")
+    args = ap.parse_args(argv)
+    if args.render_scale is None: args.render_scale = min(SCALE_MAX, max(SCALE_MIN, args.window_scale))
+    if not SCALE_MIN <= args.render_scale <= SCALE_MAX: ap.error(f"--render-scale must be between {SCALE_MIN:g} and {SCALE_MAX:g}")
+    if args.window_scale <= 0: ap.error("--window-scale must be positive")
+    if args.stress and args.engine!="numpy": ap.error("--stress needs --engine numpy")
+    if args.engine=="numpy" and not NUMPY_AVAILABLE: ap.error("--engine numpy needs numpy installed")
+    if args.connect and (args.engine!="sprites" or args.replays): ap.error("--connect can't be combined with --engine/--stress/--replays")
+    if args.eventlog and args.stress: ap.error("--eventlog doesn't record --stress rain; drop one of them")
+    if args.replays: os.makedirs(args.replays, exist_ok=True)
+    return args
+
 def main():
+    args = parse_args()
+    renderer = DirtyRenderer() if args.dirty else None
+    overlay = ProfilerOverlay(profiler); overlay.visible = args.profile
+    if args.telemetry:
+        profiler.telemetry = Telemetry(args.telemetry, counts=("sprites","drops","explosions","pool_live","pool_allocs"))
+        atexit.register(profiler.telemetry.close)
+    profiler.enabled = overlay.visible or bool(args.telemetry)
+    view.smooth = args.scale_filter=="smooth"
+    if args.window_scale != 1.0: view.set_window(args.window_scale)
+    adaptive = AdaptiveScale(args.render_scale) if args.adaptive else None
+    event_log = EventLog(args.eventlog) if args.eventlog else None
+    if event_log: atexit.register(event_log.close)
+    sounds.warm()
+    try:
+        client = NetClient(args.connect) if args.connect else None
+    except OSError as e:
+        sys.exit(f"can't connect to {args.connect}: {e}")
     nickname, difficulty = start_page()
-    game = Game(nickname, difficulty)
+    view.set_scale(args.render_scale)
+    def new_game():
+        game = NetGame(nickname, difficulty, client) if client else Game(nickname, difficulty, args.engine, args.stress)
+        if args.replays: game.on_game_over = lambda g: save_replay(g, args.replays)
+        # network games learn their seed from the server later; their logs record 0
+        if event_log: game.log = event_log.session(difficulty, 0 if client else game.seed)
+        return game
+    game = new_game()
     running=True; p_down=False
     while running:
-        dt = clock.tick(FPS)/1000.0; mx,my=pygame.mouse.get_pos()
+        dt = clock.tick(FPS)/1000.0; t0 = time.perf_counter()
+        profiler.begin_frame(dt)
         for ev in pygame.event.get():
             if ev.type==pygame.QUIT: running=False
             if ev.type==pygame.KEYDOWN:
+                if ev.key==pygame.K_F3:
+                    overlay.visible = not overlay.visible
+                    profiler.enabled = overlay.visible or bool(args.telemetry)
+                    if renderer: renderer.full = True
                 if ev.key==pygame.K_p:
                     if not p_down:
                         game.pause = not game.pause
                         p_down = True
                 if ev.key==pygame.K_r and game.game_over:
-                    game = Game(nickname, difficulty)
+                    game.recycle(); game = new_game()
                 if ev.key==pygame.K_ESCAPE:
                     running=False
             if ev.type==pygame.KEYUP:
                 if ev.key==pygame.K_p: p_down=False
+        move = read_move()
+        profiler.mark("input")
         for c in clouds: c.update(dt, wind=game.cloud_wind if hasattr(game,"cloud_wind") else 1.0)
-        game.update(dt)
-        game.draw(screen)
-        pygame.display.flip()
+        profiler.mark("clouds")
+        game.update(dt, move)
+        profiler.mark("update")
+        rects = renderer.draw(game, view.canvas) if renderer else game.draw(view.canvas)
+        profiler.mark("draw")
+        view.present()
+        if overlay.visible:
+            overlay.draw(view.window)
+            if rects is not None: rects.append(overlay.rect)
+        if renderer: renderer.flip(rects)
+        else: pygame.display.flip()
+        profiler.mark("present")
+        if adaptive and adaptive.update(time.perf_counter() - t0): game.rescale()
+        live, allocs = pool_totals() if profiler.enabled else (0, 0)
+        profiler.end_frame(sprites=len(game.all_sprites), drops=game.sim.drop_count(), explosions=len(game.expl),
+                           pool_live=live, pool_allocs=allocs)
     pygame.quit(); sys.exit()
 
 if __name__=="__main__":
@@ -0,0 +1,108 @@
+# In-memory leaderboard with off-thread persistence.
+# Every game is kept (no top-N cap); queries never touch disk and writes happen on a
+# background thread that replaces the JSON file atomically.
+import bisect, json, os, threading, time
+
+class Leaderboard:
+    def __init__(self, path="highscores.json"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = []; self.keys = []   # all entries, sorted by (-score, seq)
+        self.by_diff = {}                   # difficulty -> (keys, entries), same order
+        self.seq = 0; self.version = 0      # version bumps on every change so UIs can skip redraws
+        self._cond = threading.Condition(); self._requested = 0; self._written = 0
+        self._writer = None; self._closed = False
+        self.load()
+
+    # ---------- index ----------
+    def _insert(self, entry):
+        key = (-entry["score"], self.seq); self.seq += 1
+        i = bisect.bisect_right(self.keys, key)
+        self.keys.insert(i, key); self.entries.insert(i, entry)
+        keys, entries = self.by_diff.setdefault(entry["difficulty"], ([], []))
+        i = bisect.bisect_right(keys, key)
+        keys.insert(i, key); entries.insert(i, entry)
+
+    def load(self):
+        try:
+            if os.path.isfile(self.path):
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            else: data = []
+        except Exception:
+            data = []
+        with self.lock:
+            self.entries = []; self.keys = []; self.by_diff = {}; self.seq = 0
+            for e in data:
+                if isinstance(e, dict) and "score" in e:
+                    e.setdefault("name", "?"); e.setdefault("difficulty", "Medium"); e.setdefault("time", "")
+                    self._insert(e)
+            self.version += 1
+
+    def add(self, name, score, diff, when=None):
+        # O(log n) insert + a signal to the writer; returns the new entry's overall rank
+        entry = {"name":name, "score":score, "difficulty":diff,
+                 "time":when or time.strftime("%Y-%m-%d %H:%M")}
+        with self.lock:
+            self._insert(entry); self.version += 1
+        self.save_async()
+        return self.rank(score)
+
+    # ---------- queries ----------
+    def top(self, n=5, diff=None):
+        with self.lock:
+            if diff is None: return self.entries[:n]
+            return self.by_diff.get(diff, ([], []))[1][:n]
+
+    def rank(self, score, diff=None):
+        # 1-based position a score takes, i.e. 1 + number of strictly higher scores
+        with self.lock:
+            keys = self.keys if diff is None else self.by_diff.get(diff, ([], []))[0]
+            return bisect.bisect_left(keys, (-score,)) + 1
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ---------- persistence ----------
+    def save_async(self):
+        # requests made while a write is running coalesce into one more write of the latest state
+        with self._cond:
+            if self._closed: return
+            self._requested += 1; self._cond.notify()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="leaderboard-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while self._written == self._requested and not self._closed: self._cond.wait()
+                if self._written == self._requested: return
+                target = self._requested
+            with self.lock:
+                snapshot = list(self.entries)
+            self.save(snapshot)
+            with self._cond:
+                self._written = target; self._cond.notify_all()
+
+    def save(self, entries=None):
+        if entries is None:
+            with self.lock: entries = list(self.entries)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+    def flush(self, timeout=5.0):
+        # block until queued writes are on disk (used at exit, never on the render path)
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written >= self._requested, timeout)
+
+    def close(self, timeout=5.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True; self._cond.notify_all()
+        if self._writer is not None: self._writer.join(timeout)
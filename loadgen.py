@@ -0,0 +1,87 @@
+# Load generator for server.py: opens hundreds of sessions over localhost, plays them
+# with a random-walk input script, mirrors every snapshot through netproto.ClientState and
+# reports input-to-ack latency, snapshot interval jitter and bandwidth.
+import argparse, asyncio, random, sys, time
+
+import netproto as net
+
+perf = time.perf_counter
+
+def percentiles(samples):
+    s = sorted(samples); n = len(s)
+    if not n: return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    pick = lambda q: s[min(n-1, int(q*n))] * 1000.0
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": s[-1] * 1000.0}
+
+class Bot:
+    def __init__(self, i, diff, rng):
+        self.name = f"bot{i}"; self.diff = diff; self.rng = rng
+        self.state = net.ClientState(diff); self.seq = 0; self.pending = {}
+        self.latency = []; self.interval = []; self.last = None
+        self.games = self.snapshots = self.bytes = 0
+    async def run(self, host, port, until):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(net.hello(self.name, self.diff))
+        frames = net.FrameReader(); started = False
+        next_move = perf()
+        try:
+            while perf() < until:
+                try:
+                    data = await asyncio.wait_for(reader.read(65536), 0.1)
+                except asyncio.TimeoutError:
+                    data = b""
+                now = perf()
+                for msg in frames.feed(data):
+                    if msg[0] == net.WELCOME:
+                        _, sid, diff, seed = net.WELCOME_MSG.unpack(msg)
+                        self.state.reset(sid, net.DIFFS[diff], seed); started = True; self.last = None
+                    elif msg[0] == net.SNAPSHOT and started:
+                        self.state.apply(msg); self.snapshots += 1; self.bytes += len(msg) + 2
+                        if self.last is not None: self.interval.append(now - self.last)
+                        self.last = now
+                        for seq in [s for s in self.pending if s <= self.state.ack]:
+                            self.latency.append(now - self.pending.pop(seq))
+                if started and self.state.game_over:
+                    self.games += 1; started = False; self.pending.clear()
+                    writer.write(net.hello(self.name, self.diff))
+                if started and now >= next_move:
+                    self.seq += 1; self.pending[self.seq] = now
+                    writer.write(net.input_msg(self.seq, self.rng.choice((-1, 0, 1))))
+                    next_move = now + self.rng.uniform(0.1, 0.6)
+        finally:
+            writer.close()
+
+async def run(host, port, sessions, duration, ramp):
+    rng = random.Random(1); until = perf() + duration
+    bots = [Bot(i, net.DIFFS[i % 3], random.Random(rng.getrandbits(32))) for i in range(sessions)]
+    tasks = []
+    for b in bots:
+        tasks.append(asyncio.create_task(b.run(host, port, until)))
+        await asyncio.sleep(ramp / max(1, sessions))
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    errors = [r for r in results if isinstance(r, Exception)]
+    return bots, errors
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="simulate many Bomb & Berry clients against server.py")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7878)
+    ap.add_argument("--sessions", type=int, default=200)
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds")
+    ap.add_argument("--ramp", type=float, default=2.0, help="seconds over which sessions connect")
+    args = ap.parse_args(argv)
+    t = perf()
+    bots, errors = asyncio.run(run(args.host, args.port, args.sessions, args.duration, args.ramp))
+    wall = perf() - t
+    lat = percentiles([x for b in bots for x in b.latency])
+    iv = percentiles([x for b in bots for x in b.interval])
+    snaps = sum(b.snapshots for b in bots); nbytes = sum(b.bytes for b in bots)
+    print(f"{args.sessions} sessions, {wall:.1f}s, {sum(b.games for b in bots)} games finished, {len(errors)} errors")
+    print(f"input->ack latency  p50 {lat['p50']:6.1f}ms  p95 {lat['p95']:6.1f}ms  p99 {lat['p99']:6.1f}ms  max {lat['max']:6.1f}ms")
+    print(f"snapshot interval   p50 {iv['p50']:6.1f}ms  p95 {iv['p95']:6.1f}ms  p99 {iv['p99']:6.1f}ms  max {iv['max']:6.1f}ms")
+    print(f"snapshots {snaps/wall:,.0f}/s  {nbytes/max(1, snaps):.1f} B/snapshot  {nbytes/wall/1024:,.1f} KB/s")
+    for e in errors[:3]: print("error:", repr(e))
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# Wire format shared by server.py, loadgen.py and fruit.py --connect.
+# Frames are a u16 length followed by a payload whose first byte is the message type.
+# The server sends one snapshot per tick, carrying only what changed: drops are sent once
+# when spawned (their fall is deterministic) and again only if caught, everything else
+# (player x, score, lives, bonus, bomb hit, game over) only on the tick it changes.
+import struct
+
+from sim import (WIN_H, STEP, BONUS_DURATION, PLAYER_SPEED_BASE, FRUIT_NAMES, FRUIT_SIZE, BOMB_SIZE,
+                 DIFFICULTY, DIFFS, KINDS, BOMB_KIND, Drop, SimPlayer)
+
+# message types
+HELLO, INPUT = 1, 2                 # client -> server
+WELCOME, SNAPSHOT = 16, 17          # server -> client
+
+LEN = struct.Struct("<H")
+HELLO_MSG = struct.Struct("<BB")            # type, difficulty; followed by the utf-8 name
+INPUT_MSG = struct.Struct("<BHb")           # type, input seq, move
+WELCOME_MSG = struct.Struct("<BIBQ")        # type, session id, difficulty, seed
+SNAP_HEAD = struct.Struct("<BIH")           # type, tick, changed mask
+
+# snapshot mask bits, in the order their payloads follow the header
+PLAYER = 1          # f32 x, i8 move
+SCORE = 2           # u32
+LIVES = 4           # u8
+ACK = 8             # u16 last input seq applied
+SPAWN = 16          # u8 count, then count x SPAWN_REC
+CATCH = 32          # u8 count, then count x u16 id
+BONUS_START = 64
+BONUS_END = 128
+BOMB_HIT = 256      # every live bomb is cleared
+GAME_OVER = 512
+
+PLAYER_REC = struct.Struct("<fb")
+SPAWN_REC = struct.Struct("<HBhhh")         # id, kind, x, y before the first step, speed
+U8, U16, U32 = struct.Struct("<B"), struct.Struct("<H"), struct.Struct("<I")
+
+def frame(payload):
+    return LEN.pack(len(payload)) + payload
+
+def hello(name, diff):
+    return frame(HELLO_MSG.pack(HELLO, DIFFS.index(diff)) + name.encode("utf-8")[:64])
+
+def input_msg(seq, move):
+    return frame(INPUT_MSG.pack(INPUT, seq & 0xffff, move))
+
+def welcome(sid, diff, seed):
+    return frame(WELCOME_MSG.pack(WELCOME, sid, DIFFS.index(diff), seed))
+
+class FrameReader:
+    # splits a byte stream into payloads; partial frames wait for the next feed()
+    def __init__(self):
+        self.buf = bytearray()
+    def feed(self, data):
+        self.buf += data
+        out = []; i = 0; buf = self.buf
+        while len(buf) - i >= 2:
+            n = LEN.unpack_from(buf, i)[0]
+            if len(buf) - i - 2 < n: break
+            out.append(bytes(buf[i+2:i+2+n])); i += 2 + n
+        del buf[:i]
+        return out
+
+# ---------- Server side ----------
+class SnapshotEncoder:
+    # wraps one sim.SimGame; tick() steps it and returns the snapshot frame for that step
+    def __init__(self, sim):
+        self.sim = sim; self.live = {}; self.next_id = 1
+        self.sent = (None, None, None, None)   # player x, move, score, lives
+        self.ack = self.sent_ack = 0
+    def tick(self, tick, move):
+        sim = self.sim
+        mask = 0; body = []; spawns = []; caught = []
+        for ev, data in sim.step(STEP, move):
+            if ev == "spawn":
+                d = data; did = self.next_id; self.next_id = self.next_id % 0xffff + 1
+                self.live[did] = d
+                kind = BOMB_KIND if d.kind == "bomb" else FRUIT_NAMES.index(d.name)
+                # the sim has already stepped it once; the client replays that step
+                spawns.append(SPAWN_REC.pack(did, kind, d.x, round(d.prev_y), d.speed))
+            elif ev == "bonus_start": mask |= BONUS_START
+            elif ev == "bonus_end": mask |= BONUS_END
+            elif ev == "bomb": mask |= BOMB_HIT
+            elif ev == "gameover": mask |= GAME_OVER
+        for did, d in list(self.live.items()):
+            if d.alive: continue
+            del self.live[did]
+            # fruits that died on screen were caught; off-screen and cleared bombs are implied
+            if d.kind == "fruit" and d.y <= WIN_H: caught.append(did)
+        p = sim.player
+        if (p.x, move) != self.sent[:2]:
+            mask |= PLAYER; body.append(PLAYER_REC.pack(p.x, move))
+        if sim.score != self.sent[2]:
+            mask |= SCORE; body.append(U32.pack(sim.score))
+        if sim.lives != self.sent[3]:
+            mask |= LIVES; body.append(U8.pack(max(0, sim.lives)))
+        if self.ack != self.sent_ack:
+            mask |= ACK; body.append(U16.pack(self.ack)); self.sent_ack = self.ack
+        if spawns:
+            mask |= SPAWN; body.append(U8.pack(len(spawns))); body += spawns
+        if caught:
+            mask |= CATCH; body.append(U8.pack(len(caught))); body += [U16.pack(c) for c in caught]
+        self.sent = (p.x, move, sim.score, sim.lives)
+        return frame(SNAP_HEAD.pack(SNAPSHOT, tick & 0xffffffff, mask) + b"".join(body))
+
+# ---------- Client side ----------
+class ClientState:
+    # mirror of one server session with the read-only surface fruit.Game expects of a sim;
+    # apply() advances it by one snapshot and returns the same events SimGame.step would
+    def __init__(self, diff="Medium"):
+        self.reset(0, diff, 0)
+        self.prof = None
+    def reset(self, sid, diff, seed):
+        self.sid = sid; self.diff = diff; self.seed = seed
+        self.lives = DIFFICULTY[diff][3]; self.stress = 0
+        self.player = SimPlayer(); self.drops = {}
+        self.score = 0; self.game_over = False
+        self.bonus = False; self.bonus_timer = 0.0
+        self.tick = None; self.ack = 0; self.bytes = 0; self.snapshots = 0
+    def drop_count(self):
+        return len(self.drops)
+    def apply(self, payload):
+        _, tick, mask = SNAP_HEAD.unpack_from(payload); i = SNAP_HEAD.size
+        self.tick = tick; self.bytes += len(payload) + 2; self.snapshots += 1
+        events = []
+        p = self.player; p.prev_x = p.x
+        for d in self.drops.values(): d.update(STEP)
+        if mask & PLAYER:
+            p.x, move = PLAYER_REC.unpack_from(payload, i); i += PLAYER_REC.size
+            p.vx = PLAYER_SPEED_BASE * move
+        if mask & SCORE: self.score = U32.unpack_from(payload, i)[0]; i += 4
+        if mask & LIVES: self.lives = payload[i]; i += 1
+        if mask & ACK: self.ack = U16.unpack_from(payload, i)[0]; i += 2
+        if mask & SPAWN:
+            n = payload[i]; i += 1
+            for _ in range(n):
+                did, kind, x, y, speed = SPAWN_REC.unpack_from(payload, i); i += SPAWN_REC.size
+                size = BOMB_SIZE if kind == BOMB_KIND else FRUIT_SIZE
+                d = Drop("bomb" if kind == BOMB_KIND else "fruit", KINDS[kind], x + size//2, speed, size)
+                d.y = d.prev_y = float(y); d.update(STEP)
+                self.drops[did] = d; events.append(("spawn", d))
+        if mask & CATCH:
+            n = payload[i]; i += 1; caught = []
+            for _ in range(n):
+                d = self.drops.get(U16.unpack_from(payload, i)[0]); i += 2
+                if d:
+                    d.alive = False; caught.append((d.name, d.x + d.w//2, int(d.y) + d.h//2))
+            events.append(("catch", caught))
+        if mask & BONUS_START:
+            self.bonus = True; self.bonus_timer = BONUS_DURATION; events.append(("bonus_start", None))
+        if mask & BOMB_HIT:
+            for d in self.drops.values():
+                if d.kind == "bomb": d.alive = False
+            events.append(("bomb", p.center))
+        if mask & GAME_OVER:
+            self.game_over = True; events.append(("gameover", self.score))
+        if self.bonus: self.bonus_timer -= STEP
+        if mask & BONUS_END:
+            self.bonus = False; self.bonus_timer = 0.0; events.append(("bonus_end", None))
+        self.drops = {k: d for k, d in self.drops.items() if d.alive}
+        return events
@@ -0,0 +1,71 @@
+# Per-phase frame profiler with rolling history and optional CSV telemetry.
+# Phases are flat: each mark() charges the time since the previous mark to one phase,
+# so the phases of a frame add up to its total work time.
+import collections, time
+
+from writer import BackgroundWriter
+
+perf = time.perf_counter
+
+PHASES = ["input", "clouds", "sim.spawn", "sim.move", "sim.collide", "events", "highscore",
+          "sprites", "update", "draw", "present"]
+
+class Profiler:
+    def __init__(self, history=240):
+        self.enabled = False
+        self.history = history
+        self.phases = {p: collections.deque(maxlen=history) for p in PHASES}
+        self.work = collections.deque(maxlen=history)       # seconds of work per frame
+        self.interval = collections.deque(maxlen=history)   # seconds between frames (incl. sleep)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.counts = {}; self.telemetry = None
+        self.t = self.start = perf(); self.dt = 0.0; self.frames = 0
+    def begin_frame(self, dt):
+        # runs even while disabled so enabling mid-frame still has a start time
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.dt = dt; self.t = self.start = perf()
+    def mark(self, phase):
+        if not self.enabled: return
+        now = perf(); self.current[phase] += now - self.t; self.t = now
+    def end_frame(self, **counts):
+        if not self.enabled: return
+        work = perf() - self.start
+        for p, v in self.current.items(): self.phases[p].append(v)
+        self.work.append(work); self.interval.append(self.dt)
+        self.counts = counts; self.frames += 1
+        if self.telemetry: self.telemetry.record(self.dt, work, self.current, counts)
+    def stats(self, phase):
+        # (mean, max) in ms over the rolling window
+        h = self.phases[phase]
+        if not h: return 0.0, 0.0
+        return sum(h)/len(h)*1000.0, max(h)*1000.0
+
+# ---------- Telemetry ----------
+class Telemetry:
+    # rows collect in a fixed-size buffer; a full buffer is swapped out and written by a
+    # background thread, so the frame loop never waits on the file
+    def __init__(self, path, capacity=600, counts=("sprites", "drops")):
+        self.path = path; self.capacity = capacity; self.count_names = list(counts)
+        self.rows = []; self.frame = 0; self.t0 = perf()
+        self.closed = False
+        with open(path, "w") as f:
+            f.write(",".join(["frame", "t", "interval_ms", "work_ms"] + PHASES + ["n_"+c for c in self.count_names]) + "\n")
+        self.writer = BackgroundWriter(self._write_rows, "telemetry-writer")
+    def record(self, dt, work, phases, counts):
+        self.rows.append((self.frame, perf() - self.t0, dt, work, [phases[p] for p in PHASES],
+                          [counts.get(c, 0) for c in self.count_names]))
+        self.frame += 1
+        if len(self.rows) >= self.capacity: self.flush()
+    def flush(self):
+        if self.rows:
+            self.writer.submit(self.rows); self.rows = []
+    def _write_rows(self, rows):
+        with open(self.path, "a") as f:
+            for frame, t, dt, work, ph, cn in rows:
+                f.write(f"{frame},{t:.4f},{dt*1000:.3f},{work*1000:.3f},"
+                        + ",".join(f"{v*1000:.3f}" for v in ph) + ","
+                        + ",".join(str(c) for c in cn) + "\n")
+    def close(self, timeout=5.0):
+        if self.closed: return
+        self.flush(); self.closed = True
+        self.writer.close(timeout)
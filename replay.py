@@ -0,0 +1,106 @@
+# Input-log recording and uncapped replay for sim.SimGame.
+# A game is fully determined by (difficulty, seed, fixed step, per-step moves), so a replay
+# file only stores those plus the final score it claims; verify() re-simulates and compares.
+import argparse, struct, sys, time
+
+from sim import DIFFS, STEP, SimGame
+
+MAGIC = b"BBRP"; VERSION = 1
+HEADER = struct.Struct("<4sBBQdII")     # magic, version, difficulty, seed, step, score, steps
+
+# ---------- varint ----------
+def put_varint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7f) | 0x80); n >>= 7
+    out.append(n)
+
+def get_varint(buf, i):
+    n = shift = 0
+    while True:
+        b = buf[i]; i += 1
+        n |= (b & 0x7f) << shift; shift += 7
+        if b < 0x80: return n, i
+
+# ---------- Recording ----------
+class InputRecorder:
+    # moves are run-length encoded: holding a key for a second is one (move, 60) run
+    def __init__(self, diff, seed, step=STEP):
+        self.diff = diff; self.seed = seed; self.step = step
+        self.runs = []; self.steps = 0
+    def record(self, move):
+        if self.runs and self.runs[-1][0] == move: self.runs[-1][1] += 1
+        else: self.runs.append([move, 1])
+        self.steps += 1
+    def moves(self):
+        for move, count in self.runs:
+            for _ in range(count): yield move
+    def to_bytes(self, score):
+        out = bytearray(HEADER.pack(MAGIC, VERSION, DIFFS.index(self.diff), self.seed, self.step, score, self.steps))
+        for move, count in self.runs:
+            out.append(move + 1); put_varint(out, count)
+        return bytes(out)
+    def save(self, path, score):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes(score))
+
+class Replay(InputRecorder):
+    def __init__(self, diff, seed, step, score):
+        super().__init__(diff, seed, step)
+        self.score = score
+
+def loads(data):
+    # any malformed input raises ValueError
+    if len(data) < HEADER.size: raise ValueError("truncated replay")
+    magic, version, diff, seed, step, score, steps = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION: raise ValueError("not a Bomb & Berry replay")
+    if diff >= len(DIFFS): raise ValueError("bad difficulty")
+    rep = Replay(DIFFS[diff], seed, step, score)
+    i = HEADER.size
+    while i < len(data):
+        move = data[i] - 1
+        if move not in (-1, 0, 1): raise ValueError("bad move")
+        try: count, i = get_varint(data, i + 1)
+        except IndexError: raise ValueError("truncated replay") from None
+        rep.runs.append([move, count]); rep.steps += count
+    if rep.steps != steps: raise ValueError("truncated replay")
+    return rep
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+# ---------- Playback ----------
+def simulate(rec, engine=SimGame):
+    # re-runs the game as fast as the CPU allows; returns the finished game
+    game = engine(rec.diff, rec.seed)
+    step = game.step; dt = rec.step
+    for move in rec.moves():
+        step(dt, move)
+    return game
+
+def verify(rec, engine=SimGame):
+    return simulate(rec, engine).score == rec.score
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="re-simulate Bomb & Berry replays and check their scores")
+    ap.add_argument("files", nargs="+")
+    ap.add_argument("--engine", choices=["sprites","numpy"], default="sprites",
+                    help="simulation engine to replay with (sprites = sim.SimGame)")
+    args = ap.parse_args(argv)
+    engine = SimGame
+    if args.engine == "numpy":
+        from entities import ArrayGame as engine
+    bad = 0
+    for path in args.files:
+        try: rec = load(path)
+        except (OSError, ValueError) as e:
+            print(f"{path}: UNREADABLE ({e})"); bad += 1
+            continue
+        t = time.perf_counter(); game = simulate(rec, engine); t = time.perf_counter() - t
+        ok = game.score == rec.score; bad += not ok
+        print(f"{path}: {rec.diff} seed={rec.seed} steps={rec.steps} claimed={rec.score} "
+              f"replayed={game.score} {'OK' if ok else 'MISMATCH'} ({rec.steps/max(t,1e-9):,.0f} steps/s)")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
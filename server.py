@@ -0,0 +1,115 @@
+# Authoritative headless game server: many sim.SimGame sessions in one asyncio process,
+# all stepped on one shared fixed tick. Clients send only their move; every tick each
+# session gets a delta snapshot (see netproto.py). No pygame needed.
+import argparse, asyncio, collections, random, sys, time
+
+import netproto as net
+from sim import STEP, IDLE, SimGame
+from leaderboard import Leaderboard
+
+perf = time.perf_counter
+MAX_BACKLOG = 256 * 1024    # bytes queued for a client before it is considered stuck
+
+class Session:
+    def __init__(self, sid, writer):
+        self.sid = sid; self.writer = writer
+        self.name = ""; self.enc = None; self.move = IDLE
+    def start(self, name, diff, seed):
+        self.name = name; self.move = IDLE
+        self.enc = net.SnapshotEncoder(SimGame(diff, seed))
+        self.writer.write(net.welcome(self.sid, diff, seed))
+
+def valid(msg):
+    # client frames the handler can act on; anything else ends the connection
+    if not msg: return False
+    if msg[0] == net.HELLO: return len(msg) >= net.HELLO_MSG.size and msg[1] < len(net.DIFFS)
+    if msg[0] == net.INPUT: return len(msg) == net.INPUT_MSG.size
+    return False
+
+class GameServer:
+    def __init__(self, leaderboard=None, seed=None):
+        self.sessions = {}; self.next_sid = 1; self.tick = 0
+        self.leaderboard = leaderboard; self.rng = random.Random(seed)
+        # per-tick work times since the last report; bounded for servers run with --stats 0
+        self.work = collections.deque(maxlen=3600); self.late = 0; self.sent = 0
+    # ---------- connections ----------
+    async def handle(self, reader, writer):
+        s = Session(self.next_sid, writer); self.next_sid += 1
+        frames = net.FrameReader()
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data: break
+                for msg in frames.feed(data):
+                    if not valid(msg): return     # malformed: drop the client
+                    if msg[0] == net.HELLO:
+                        _, diff = net.HELLO_MSG.unpack_from(msg)
+                        # (re)start: a finished game restarts on the same connection
+                        s.start(msg[net.HELLO_MSG.size:].decode("utf-8", "replace"), net.DIFFS[diff], self.rng.getrandbits(32))
+                        self.sessions[s.sid] = s
+                    elif msg[0] == net.INPUT and s.enc:
+                        _, seq, move = net.INPUT_MSG.unpack_from(msg)
+                        s.move = max(-1, min(1, move)); s.enc.ack = seq
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.sessions.pop(s.sid, None)
+            writer.close()
+    # ---------- tick ----------
+    def step_all(self):
+        tick = self.tick; self.tick += 1
+        for s in list(self.sessions.values()):
+            sim = s.enc.sim
+            if sim.game_over: continue
+            if s.writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+                s.writer.transport.abort(); self.sessions.pop(s.sid, None); continue
+            snap = s.enc.tick(tick, s.move)
+            s.writer.write(snap); self.sent += len(snap)
+            if sim.game_over and self.leaderboard is not None: self.leaderboard.add(s.name, sim.score, sim.diff)
+    async def run_ticks(self):
+        loop = asyncio.get_running_loop()
+        next_t = loop.time()
+        while True:
+            t0 = perf(); self.step_all(); self.work.append(perf() - t0)
+            next_t += STEP
+            delay = next_t - loop.time()
+            if delay < 0:
+                self.late += 1
+                # far behind (machine stall): skip ahead instead of bursting ticks
+                if delay < -8*STEP: next_t = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+    async def report(self, every):
+        while True:
+            await asyncio.sleep(every)
+            w = sorted(self.work) or [0.0]; n = len(w)
+            print(f"tick {self.tick}  sessions {len(self.sessions)}  work p50 {w[n//2]*1000:.2f}ms "
+                  f"p99 {w[min(n-1, int(n*0.99))]*1000:.2f}ms  late {self.late}  out {self.sent/every/1024:.1f} KB/s", flush=True)
+            self.work.clear(); self.late = 0; self.sent = 0
+
+async def serve(host, port, leaderboard=None, stats=5.0):
+    gs = GameServer(leaderboard)
+    server = await asyncio.start_server(gs.handle, host, port)
+    print(f"serving on {host}:{port}", flush=True)
+    tasks = [asyncio.create_task(gs.run_ticks())]
+    if stats: tasks.append(asyncio.create_task(gs.report(stats)))
+    async with server:
+        await asyncio.gather(server.serve_forever(), *tasks)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Bomb & Berry game server")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=7878)
+    ap.add_argument("--highscores", metavar="JSON", help="record finished games in this leaderboard file")
+    ap.add_argument("--stats", type=float, default=5.0, metavar="SEC", help="print tick stats this often (0 = never)")
+    args = ap.parse_args(argv)
+    lb = Leaderboard(args.highscores) if args.highscores else None
+    try:
+        asyncio.run(serve(args.host, args.port, lb, args.stats))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if lb is not None: lb.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+# Headless simulation core for Bomb & Berry: no pygame, no display, actions in, events out.
+import random
+
+# ---------- CONFIG ----------
+WIN_W, WIN_H = 820, 820
+FPS = 60
+STEP = 1.0/FPS      # fixed simulation timestep; front ends accumulate frame time and interpolate
+
+PLAYER_SPEED_BASE = 420
+FRUIT_SPEED_BASE = 190
+BOMB_SPEED_BASE = 260
+
+DIFFICULTY = {
+    "Easy":    (1.2, 0.90, 0.90, 4),
+    "Medium":  (0.9, 1.00, 1.00, 3),
+    "Hard":    (0.7, 1.15, 1.25, 2)
+}
+
+BONUS_DURATION = 8.0
+
+# spawn interval shrinks by score/RAMP_SCORE seconds, by at most RAMP_MAX
+RAMP_SCORE = 600.0
+RAMP_MAX = 0.4
+
+PLAYER_W, PLAYER_H = 80, 90
+FRUIT_SIZE, BOMB_SIZE = 44, 40
+FRUIT_NAMES = ["Apple", "Banana", "Orange", "Grape", "Cherry"]
+
+# codes shared by the array engine, wire and file formats: indices into these lists
+DIFFS = list(DIFFICULTY)
+KINDS = FRUIT_NAMES + ["Bomb"]
+BOMB_KIND = len(FRUIT_NAMES)
+
+# actions: -1 left, 0 idle, 1 right
+LEFT, IDLE, RIGHT = -1, 0, 1
+
+def overlap(ax, ay, aw, ah, bx, by, bw, bh):
+    # same test as pygame.Rect.colliderect: touching edges don't count
+    return ax < bx+bw and bx < ax+aw and ay < by+bh and by < ay+ah
+
+def spawn_interval(base, score, bonus, ramp=RAMP_SCORE):
+    interval = max(0.3, base - min(RAMP_MAX, score/ramp))
+    if bonus: interval = max(0.18, interval*0.6)
+    return interval
+
+# ---------- Entities ----------
+# positions are floats (sub-pixel); prev_* hold the value before the last step for interpolation
+def lerp(a, b, alpha):
+    return a + (b - a) * alpha
+
+class SimPlayer:
+    def __init__(self):
+        self.w, self.h = PLAYER_W, PLAYER_H
+        self.x = self.prev_x = float(WIN_W//2 - self.w//2)
+        self.y = WIN_H - 40 - self.h
+        self.vx = 0
+    def update(self, dt, move=IDLE):
+        self.prev_x = self.x
+        self.vx = PLAYER_SPEED_BASE * move
+        self.x += self.vx * dt
+        self.x = max(6.0, min(WIN_W - self.w - 6.0, self.x))
+    @property
+    def center(self):
+        return (int(self.x) + self.w//2, self.y + self.h//2)
+
+class Drop:
+    def __init__(self, kind, name, cx, speed, size):
+        self.kind = kind; self.name = name
+        self.w = self.h = size
+        self.x = cx - size//2; self.y = self.prev_y = -40.0
+        self.speed = speed; self.alive = True
+    def update(self, dt):
+        self.prev_y = self.y
+        self.y += self.speed * dt
+        if self.y > WIN_H: self.alive = False
+
+# ---------- Game ----------
+# rules live in step(); the drop store (lists of Drop here) sits behind the small
+# spawn/move/catch/hit/cull hooks so other engines can swap the storage
+class SimGame:
+    def __init__(self, diff="Medium", seed=None, stress=0):
+        self.diff = diff
+        self.spawn_interval, self.fruit_mult, self.bomb_mult, self.lives = DIFFICULTY[diff]
+        self.rng = random.Random(seed)
+        self.stress = stress    # keep at least this many drops falling (extra fruit rain)
+        self.player = SimPlayer()
+        self.init_drops()
+        self.score = 0; self.spawn_timer = 0.0; self.game_over = False
+        self.bonus = False; self.bonus_timer = 0.0
+        self.time = 0.0
+        self.prof = None        # optional profiler.Profiler; step() marks its phases when set
+    def roll_fruit(self, y=-40):
+        name = self.rng.choice(FRUIT_NAMES)
+        cx = self.rng.randint(28, WIN_W-28)
+        speed = int(FRUIT_SPEED_BASE*self.fruit_mult + self.rng.randint(-30, 30))
+        d = Drop("fruit", name, cx, speed, FRUIT_SIZE); d.y = d.prev_y = float(y)
+        return d
+    def roll_bomb(self):
+        cx = self.rng.randint(28, WIN_W-28)
+        speed = int(BOMB_SPEED_BASE*self.bomb_mult + self.rng.randint(-30, 30))
+        return Drop("bomb", "Bomb", cx, speed, BOMB_SIZE)
+    def stress_y(self):
+        return self.rng.randint(-WIN_H, -40)
+    # ---------- drop store hooks ----------
+    def init_drops(self):
+        self.fruits = []; self.bombs = []
+    def spawn_fruit(self):
+        d = self.roll_fruit(); self.fruits.append(d)
+        return d
+    def spawn_bomb(self):
+        d = self.roll_bomb(); self.bombs.append(d)
+        return d
+    def top_up(self):
+        for _ in range(self.stress - self.drop_count()):
+            self.fruits.append(self.roll_fruit(self.stress_y()))
+    def drop_count(self):
+        return len(self.fruits) + len(self.bombs)
+    def move_drops(self, dt):
+        for d in self.fruits: d.update(dt)
+        for d in self.bombs: d.update(dt)
+    def catch_fruits(self):
+        # marks overlapping fruits dead; returns [(name, cx, cy)] of the catches
+        p = self.player
+        caught = [f for f in self.fruits if f.alive and overlap(p.x, p.y, p.w, p.h, f.x, f.y, f.w, f.h)]
+        for f in caught: f.alive = False
+        return [(f.name, f.x + f.w//2, int(f.y) + f.h//2) for f in caught]
+    def hit_bomb(self):
+        p = self.player
+        return any(b.alive and overlap(p.x, p.y, p.w, p.h, b.x, b.y, b.w, b.h) for b in self.bombs)
+    def clear_bombs(self):
+        for b in self.bombs: b.alive = False
+    def cull(self):
+        self.fruits = [f for f in self.fruits if f.alive]
+        self.bombs = [b for b in self.bombs if b.alive]
+    # ---------- rules ----------
+    def step(self, dt, move=IDLE):
+        # advance one frame; returns a list of (event, data) tuples for the front end
+        events = []
+        if self.game_over: return events
+        self.time += dt
+        self.spawn_timer += dt
+        if self.spawn_timer >= spawn_interval(self.spawn_interval, self.score, self.bonus):
+            self.spawn_timer = 0.0
+            if (not self.bonus) and self.rng.random() > 0.75: d = self.spawn_bomb()
+            else: d = self.spawn_fruit()
+            events.append(("spawn", d))
+        if self.stress: self.top_up()
+        prof = self.prof
+        if prof: prof.mark("sim.spawn")
+        p = self.player
+        p.update(dt, move)
+        self.move_drops(dt)
+        if prof: prof.mark("sim.move")
+        caught = self.catch_fruits()
+        if caught:
+            self.score += 10*len(caught)
+            events.append(("catch", caught))
+            if (self.score // 100) > ((self.score - 10*len(caught))//100):
+                self.bonus = True; self.bonus_timer = BONUS_DURATION
+                events.append(("bonus_start", None))
+        if self.hit_bomb():
+            self.clear_bombs()
+            self.lives -= 1
+            events.append(("bomb", p.center))
+            if self.lives <= 0:
+                self.game_over = True
+                events.append(("gameover", self.score))
+        if self.bonus:
+            self.bonus_timer -= dt
+            if self.bonus_timer <= 0:
+                self.bonus = False; self.bonus_timer = 0.0
+                events.append(("bonus_end", None))
+        self.cull()
+        if prof: prof.mark("sim.collide")
+        return events
@@ -0,0 +1,87 @@
+# Lazily synthesized sound effects with an on-disk PCM cache.
+# Tones are generated on first use (or by warm() on a background thread) and their raw
+# samples are cached by parameters, so later launches load bytes and never import numpy.
+import os, threading
+import pygame
+
+# name -> (frequency Hz, duration s, volume 0..1)
+TONES = {
+    "catch":     (880.0, 0.09, 0.25),
+    "explosion": (120.0, 0.35, 0.70),
+    "gameover":  (200.0, 0.60, 0.60),
+}
+SAMPLE_RATE = 44100
+CACHE_VERSION = 1
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("BB_CACHE_DIR") or os.path.join(base, "bombandberry")
+
+def synth_tone(freq, dur, vol, sr=SAMPLE_RATE):
+    # interleaved 16-bit stereo PCM: a sine with a simple exponential decay
+    import numpy as np
+    t = np.linspace(0, dur, int(sr*dur), False)
+    tone = np.sin(2*np.pi*freq*t)
+    env = np.exp(-3*t)
+    samples = (tone * env * vol * (2**15-1)).astype(np.int16)
+    return np.column_stack((samples, samples)).astype("<i2").tobytes()
+
+class SoundBank:
+    def __init__(self, cache_dir=None, tones=TONES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.tones = tones; self.sounds = {}
+        self.lock = threading.Lock(); self.warmer = None
+        self.stats = {"cache_hits": 0, "synthesized": 0}
+    def path(self, params):
+        freq, dur, vol = params
+        return os.path.join(self.cache_dir, f"tone-v{CACHE_VERSION}-{freq:g}-{dur:g}-{vol:g}-{SAMPLE_RATE}.pcm")
+    def pcm(self, params):
+        path = self.path(params)
+        try:
+            with open(path, "rb") as f: data = f.read()
+            self.stats["cache_hits"] += 1
+            return data
+        except OSError:
+            pass
+        try:
+            data = synth_tone(*params)
+        except ImportError:
+            return None     # no numpy and nothing cached: play silently
+        self.stats["synthesized"] += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = path + f".{os.getpid()}.tmp"
+            with open(tmp, "wb") as f: f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            pass            # read-only home etc.: still usable, just not cached
+        return data
+    def load(self, name):
+        data = self.pcm(self.tones[name])
+        init = pygame.mixer.get_init()
+        if data is None or not init: return None
+        try:
+            if init[1:] == (-16, 2): return pygame.mixer.Sound(buffer=data)
+            # other mixer formats go through numpy so pygame converts the samples
+            import numpy as np
+            return pygame.mixer.Sound(np.frombuffer(data, "<i2").reshape(-1, 2).copy())
+        except Exception:
+            return None
+    def get(self, name):
+        # None when sound is unavailable; callers just skip playback
+        if name in self.sounds: return self.sounds[name]
+        with self.lock:
+            if name not in self.sounds: self.sounds[name] = self.load(name)
+        return self.sounds[name]
+    def warm(self):
+        # prepare every tone off the main thread so the first catch doesn't stall a frame
+        if self.warmer is None:
+            self.warmer = threading.Thread(target=lambda: [self.get(n) for n in self.tones], name="sound-warm", daemon=True)
+            self.warmer.start()
+        return self.warmer
+    def play(self, name):
+        s = self.get(name)
+        try:
+            if s: s.play()
+        except Exception:
+            pass
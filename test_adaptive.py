@@ -0,0 +1,37 @@
+# AdaptiveScale against synthetic per-scale frame costs; run with `python -m pytest`.
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy"); os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+pytest.importorskip("pygame")
+import fruit
+
+@pytest.fixture(autouse=True)
+def full_scale():
+    fruit.view.set_scale(1.0)
+    yield
+    fruit.view.set_scale(1.0)
+
+def run(costs, budget, frames=3000, rebuild=0.05):
+    # work per frame is the cost at the current scale; the first frame after a change also
+    # pays for regenerating sprites
+    adaptive = fruit.AdaptiveScale(1.0, budget); last = fruit.view.scale; works = []
+    for _ in range(frames):
+        w = costs[fruit.view.scale] + (rebuild if fruit.view.scale != last else 0)
+        last = fruit.view.scale
+        adaptive.update(w); works.append(w)
+    return adaptive, works
+
+def test_lower_scale_that_costs_more_is_abandoned():
+    # smoothscale upscaling: smaller canvases are slower than drawing at 1x
+    costs = {1.0: 0.00092, 0.75: 0.0017, 0.5: 0.0035}
+    adaptive, works = run(costs, budget=0.0009)
+    assert fruit.view.scale == 1.0 and adaptive.floor == 1.0
+    assert sum(works[-1000:]) / 1000 == pytest.approx(costs[1.0])
+
+def test_cheaper_lower_scale_is_kept():
+    costs = {1.0: 0.020, 0.75: 0.012, 0.5: 0.006}
+    adaptive, works = run(costs, budget=1.0/60)
+    assert fruit.view.scale == 0.75
+    assert sum(works[-1000:]) / 1000 == pytest.approx(costs[0.75])
@@ -0,0 +1,46 @@
+# BatchEnv against sim.SimGame on the same spawns and inputs; run with `python -m pytest`.
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+from env import BatchEnv, OBS_SIZE
+from sim import DIFFS, FRUIT_NAMES, STEP, SimGame
+from test_replay import scripted_moves
+
+class SimDraws:
+    # stands in for a one-game BatchEnv's numpy Generator, drawing from random.Random(seed)
+    # in the order SimGame.step/roll_* do, so both engines see the same spawns
+    def __init__(self, seed, env):
+        self.r = random.Random(seed); self.env = env; self.bomb = False; self.cx_next = True
+    def random(self, k):
+        # SimGame only rolls for a bomb outside bonus time
+        if self.env.bonus[0]: self.bomb = False; return np.zeros(1)
+        r = self.r.random(); self.bomb = r > 0.75
+        return np.array([r])
+    def integers(self, lo, hi, k, endpoint=False):
+        if self.cx_next and not self.bomb: self.r.choice(FRUIT_NAMES)    # roll_fruit picks a name first
+        self.cx_next = not self.cx_next
+        return np.array([self.r.randint(lo, hi if endpoint else hi - 1)])
+
+@pytest.mark.parametrize("seed", [5, 31, 71, 122, 777, 31337])   # 71, 122: Hard games past the ramp cap
+def test_batch_env_matches_sim(seed):
+    diff = DIFFS[seed % len(DIFFS)]
+    game = SimGame(diff, seed)
+    env = BatchEnv(1, diff, autoreset=False); env.rng = SimDraws(seed, env)
+    for i, move in enumerate(scripted_moves(seed, 60*240)):
+        game.step(STEP, move); env.step(np.array([move]))
+        state = (env.score[0], env.lives[0], env.dalive.sum(), env.done[0], env.bonus[0], env.px[0])
+        assert state == (game.score, game.lives, game.drop_count(), game.game_over, game.bonus, game.player.x), i
+        if game.game_over: break
+    assert game.game_over
+
+def test_autoreset_restarts_only_finished_games():
+    env = BatchEnv(64, "Hard", seed=0)
+    for _ in range(60*120):
+        obs, reward, done = env.step(np.zeros(64, int))
+        if done.any(): break
+    assert done.any() and not done.all() and not env.done.any()
+    assert (env.time[done] == 0).all() and (env.time[~done] > 0).all()
+    assert (env.lives[done] == env.start_lives[done]).all() and not env.dalive[done].any()
+    assert (obs[done, 1] == env.start_lives[done]).all() and (obs[done, 3] == 0).all()
@@ -0,0 +1,65 @@
+# Replay round trip and list/numpy engine parity; run with `python -m pytest`.
+import random
+
+import pytest
+
+from sim import DIFFS, STEP, SimGame
+import replay
+from replay import InputRecorder, loads, simulate, verify
+
+def scripted_moves(seed, steps):
+    # held keys of random length, independent of game state so every engine gets the same input
+    rng = random.Random(seed); moves = []
+    while len(moves) < steps:
+        moves += [rng.choice((-1, 0, 1))] * rng.randint(1, 90)
+    return moves[:steps]
+
+def play(game, moves, rec=None):
+    for move in moves:
+        if game.game_over: break
+        if rec: rec.record(move)
+        game.step(STEP, move)
+    return game
+
+@pytest.mark.parametrize("diff", DIFFS)
+def test_replay_round_trip(diff):
+    rec = InputRecorder(diff, 1234)
+    game = play(SimGame(diff, 1234), scripted_moves(1, 60*120), rec)
+    rep = loads(rec.to_bytes(game.score))
+    assert (rep.diff, rep.seed, rep.step, rep.steps) == (diff, 1234, STEP, rec.steps)
+    assert list(rep.moves()) == list(rec.moves())
+    assert verify(rep)
+    assert simulate(rep).lives == game.lives
+
+def test_replay_rejects_wrong_score():
+    rec = InputRecorder("Medium", 7)
+    game = play(SimGame("Medium", 7), scripted_moves(2, 60*60), rec)
+    assert not verify(loads(rec.to_bytes(game.score + 10)))
+
+def test_replay_rejects_malformed():
+    rec = InputRecorder("Easy", 3)
+    play(SimGame("Easy", 3), scripted_moves(3, 600), rec)
+    data = rec.to_bytes(0)
+    for bad in (data[:10], data[:-1], data[:-2], data[:-2] + b"\x07\x01", b"XXXX" + data[4:]):
+        with pytest.raises(ValueError):
+            loads(bad)
+
+def test_main_reports_unreadable_files_and_continues(tmp_path, capsys):
+    rec = InputRecorder("Hard", 9)
+    game = play(SimGame("Hard", 9), scripted_moves(9, 60*60), rec)
+    good, cut = tmp_path / "good.bbr", tmp_path / "cut.bbr"
+    rec.save(good, game.score); cut.write_bytes(rec.to_bytes(game.score)[:-1])
+    assert replay.main([str(cut), str(tmp_path / "missing.bbr"), str(good)]) == 1
+    out = capsys.readouterr().out.splitlines()
+    assert "UNREADABLE" in out[0] and "UNREADABLE" in out[1] and out[2].startswith(f"{good}: Hard") and "OK" in out[2]
+
+@pytest.mark.parametrize("seed", [0, 1, 42, 2024, 99991])
+def test_array_engine_matches_sim(seed):
+    pytest.importorskip("numpy")
+    from entities import ArrayGame
+    diff = DIFFS[seed % len(DIFFS)]
+    a, b = SimGame(diff, seed), ArrayGame(diff, seed)
+    for i, move in enumerate(scripted_moves(seed, 60*180)):
+        a.step(STEP, move); b.step(STEP, move)
+        assert (a.score, a.lives, a.drop_count(), a.game_over) == (b.score, b.lives, b.drop_count(), b.game_over), i
+        if a.game_over: break
@@ -0,0 +1,26 @@
+# Background writer shared by the telemetry CSV and the event logs.
+# Items are handed to write() in submission order on one daemon thread, so the frame loop
+# only appends to a queue; close() waits until everything submitted before it is written.
+import collections, threading
+
+class BackgroundWriter:
+    def __init__(self, write, name="writer"):
+        self.write = write
+        self.queue = collections.deque(); self.cond = threading.Condition(); self.closed = False
+        self.thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self.thread.start()
+    def submit(self, item):
+        with self.cond:
+            if self.closed: return      # nothing would pick it up
+            self.queue.append(item); self.cond.notify()
+    def _loop(self):
+        while True:
+            with self.cond:
+                while not self.queue and not self.closed: self.cond.wait()
+                if not self.queue: return       # closed and drained
+                item = self.queue.popleft()
+            self.write(item)
+    def close(self, timeout=5.0):
+        with self.cond:
+            self.closed = True; self.cond.notify()
+        self.thread.join(timeout)